@@ -21,7 +21,8 @@ from perspective_kb.utils import (
     display_summary, 
     display_table,
     ensure_directory,
-    safe_operation
+    safe_operation,
+    json_default
 )
 
 
@@ -88,7 +89,7 @@ class PerspectiveKBProcessor:
             data_helper = DataHelper()
             # 尝试一个简单的嵌入测试
             test_embedding = data_helper.embed_text("测试连接")
-            if test_embedding:
+            if test_embedding is not None:
                 console.print(f"[green]✅ Ollama连接正常 (模型: {data_helper.embedding_model})[/green]")
             else:
                 console.print("[red]❌ Ollama嵌入测试失败[/red]")
@@ -148,7 +149,7 @@ class PerspectiveKBProcessor:
                 collection_name="knowledge", 
                 vector_dim=settings.vector_dim,
                 metric_type=settings.similarity_metric,
-                index_type="FLAT" if settings.use_flat_index else "IVF_FLAT"
+                index_type=settings.get_index_type()
             ):
                 console.print("[green]✅ 知识库集合创建成功[/green]")
             else:
@@ -158,11 +159,13 @@ class PerspectiveKBProcessor:
             
             # 插入知识库数据
             console.print("[cyan]插入知识库数据...[/cyan]")
-            if db.upsert(
-                entities=perspective_dictionary,
-                collection_name="knowledge",
-                batch_size=settings.batch_size
-            ):
+            with db.bulk_load("knowledge"):
+                inserted = await db.upsert_async(
+                    entities=perspective_dictionary,
+                    collection_name="knowledge",
+                    batch_size=settings.batch_size
+                )
+            if inserted:
                 console.print("[green]✅ 知识库数据插入成功[/green]")
             else:
                 console.print("[red]❌ 知识库数据插入失败[/red]")
@@ -209,7 +212,7 @@ class PerspectiveKBProcessor:
                 collection_name="feedback", 
                 vector_dim=settings.vector_dim,
                 metric_type=settings.similarity_metric,
-                index_type="FLAT" if settings.use_flat_index else "IVF_FLAT"
+                index_type=settings.get_index_type()
             ):
                 console.print("[green]✅ 反馈集合创建成功[/green]")
             else:
@@ -219,11 +222,13 @@ class PerspectiveKBProcessor:
             
             # 插入反馈数据
             console.print("[cyan]插入反馈数据...[/cyan]")
-            if db.upsert(
-                entities=feedback_corpus,
-                collection_name="feedback",
-                batch_size=settings.batch_size
-            ):
+            with db.bulk_load("feedback"):
+                inserted = await db.upsert_async(
+                    entities=feedback_corpus,
+                    collection_name="feedback",
+                    batch_size=settings.batch_size
+                )
+            if inserted:
                 console.print("[green]✅ 用户反馈数据插入成功[/green]")
             else:
                 console.print("[red]❌ 用户反馈数据插入失败[/red]")
@@ -300,7 +305,7 @@ class PerspectiveKBProcessor:
     def _save_json_file(self, file_path: Path, data: Any) -> None:
         """保存JSON文件"""
         with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            json.dump(data, f, ensure_ascii=False, indent=2, default=json_default)
     
     async def display_final_summary(self, 
                                   db: BaseVectorDB, 
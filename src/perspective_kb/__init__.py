@@ -8,19 +8,41 @@ __version__ = "0.1.0"
 __author__ = "Abyteon"
 __email__ = "bai.tn@icloud.com"
 
+import importlib
+
 # 主要类
 from .config import Settings, settings
-from .vector_db import LocalVectorDB, ServerVectorDB, get_vector_db, VectorDBError
-from .data_helper import DataHelper, DataProcessingError
-from .utils import (
-    get_logger,
-    timer,
-    console,
-    display_table,
-    display_summary,
-    safe_operation,
-    ensure_directory
-)
+
+# 其余导出在首次访问时才导入子模块，只用配置时不加载pymilvus/ollama
+_LAZY_EXPORTS = {
+    "LocalVectorDB": ".vector_db",
+    "AsyncLocalVectorDB": ".vector_db",
+    "ServerVectorDB": ".vector_db",
+    "get_vector_db": ".vector_db",
+    "VectorDBError": ".vector_db",
+    "DataHelper": ".data_helper",
+    "DataProcessingError": ".data_helper",
+    "get_logger": ".utils",
+    "timer": ".utils",
+    "console": ".utils",
+    "display_table": ".utils",
+    "display_summary": ".utils",
+    "safe_operation": ".utils",
+    "ensure_directory": ".utils",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
 
 # 版本信息
 __all__ = [
@@ -35,6 +57,7 @@ __all__ = [
     
     # 核心类
     "LocalVectorDB",
+    "AsyncLocalVectorDB",
     "ServerVectorDB",
     "get_vector_db",
     "VectorDBError",
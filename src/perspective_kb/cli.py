@@ -18,7 +18,8 @@ from .utils import (
     display_table, 
     display_summary,
     ensure_directory,
-    get_logger
+    get_logger,
+    json_default
 )
 
 app = typer.Typer(
@@ -134,12 +135,13 @@ def process(
             
             # 创建集合并插入数据
             local_db.create_collection("knowledge", force_recreate=force)
-            local_db.upsert(perspective_dictionary, "knowledge")
+            with local_db.bulk_load("knowledge"):
+                local_db.upsert(perspective_dictionary, "knowledge")
             
             # 保存处理后的数据
             knowledge_output_file = settings.processed_dir / "canonical_perspectives.json"
             with open(knowledge_output_file, "w", encoding="utf-8") as f:
-                json.dump(perspective_dictionary, f, ensure_ascii=False, indent=2)
+                json.dump(perspective_dictionary, f, ensure_ascii=False, indent=2, default=json_default)
             
             console.print(f"[green]✅ 知识库处理完成，共 {len(perspective_dictionary)} 条记录[/green]")
             
@@ -162,12 +164,13 @@ def process(
             
             # 创建集合并插入数据
             local_db.create_collection("feedback", force_recreate=force)
-            local_db.upsert(feedback_corpus, "feedback")
+            with local_db.bulk_load("feedback"):
+                local_db.upsert(feedback_corpus, "feedback")
             
             # 保存处理后的数据
             feedback_output_file = settings.processed_dir / "user_feedback_corpus.json"
             with open(feedback_output_file, "w", encoding="utf-8") as f:
-                json.dump(feedback_corpus, f, ensure_ascii=False, indent=2)
+                json.dump(feedback_corpus, f, ensure_ascii=False, indent=2, default=json_default)
             
             console.print(f"[green]✅ 用户反馈处理完成，共 {len(feedback_corpus)} 条记录[/green]")
             
@@ -293,7 +296,7 @@ def status(
         try:
             data_helper = DataHelper()
             test_embedding = data_helper.embed_text("测试连接")
-            ollama_status = "healthy" if test_embedding else "unhealthy"
+            ollama_status = "healthy" if test_embedding is not None else "unhealthy"
             
             status_data["components"]["ollama"] = {
                 "status": ollama_status,
@@ -374,7 +377,7 @@ def search(
         
         console.print(f"[dim]正在向量化查询文本...[/dim]")
         embedding = data_helper.embed_text(query_text)
-        if not embedding:
+        if embedding is None:
             console.print("[red]❌ 查询文本向量化失败[/red]")
             raise typer.Exit(1)
         
@@ -628,7 +631,7 @@ def config(
         {"配置项": "嵌入模型", "值": settings.embedding_model},
         {"配置项": "向量维度", "值": settings.vector_dim},
         {"配置项": "相似度度量", "值": settings.similarity_metric},
-        {"配置项": "索引类型", "值": "FLAT" if settings.use_flat_index else "IVF_FLAT"},
+        {"配置项": "索引类型", "值": settings.get_index_type()},
         {"配置项": "返回结果数", "值": settings.top_k},
     ]
     display_table(model_config, "模型配置")
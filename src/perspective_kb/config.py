@@ -25,6 +25,21 @@ class VectorDBType(str, Enum):
     MILVUS_SERVER = "milvus_server"
 
 
+class VectorDType(str, Enum):
+    """向量存储精度"""
+    FLOAT32 = "float32"
+    BFLOAT16 = "bfloat16"  # 仅Milvus服务器支持
+
+
+class IndexType(str, Enum):
+    """向量索引类型"""
+    FLAT = "FLAT"
+    IVF_FLAT = "IVF_FLAT"
+    IVF_SQ8 = "IVF_SQ8"  # 每维1字节，扫描带宽约为IVF_FLAT的1/4
+    IVF_PQ = "IVF_PQ"  # 乘积量化，搜索后按原始向量重排；仅Milvus服务器支持
+    HNSW = "HNSW"
+
+
 class Settings(BaseSettings):
     """
     应用配置类
@@ -51,10 +66,18 @@ class Settings(BaseSettings):
     milvus_username: Optional[str] = Field(default=None, description="Milvus用户名")
     milvus_password: Optional[str] = Field(default=None, description="Milvus密码")
     milvus_use_server: bool = Field(default=False, description="是否使用Milvus服务器模式")
+    milvus_pool_max_total: int = Field(default=20, description="同一地址的Milvus连接总数上限", ge=1)
+    milvus_pool_max_idle: int = Field(default=10, description="同一地址保留的空闲Milvus连接数", ge=0)
+    milvus_pool_max_wait: float = Field(default=5.0, description="连接数已满时等待归还的秒数", gt=0)
     
     # ============ Ollama配置 ============
     ollama_host: str = Field(default="http://localhost:11434", description="Ollama服务地址")
     ollama_timeout: int = Field(default=300, description="Ollama超时时间(秒)", ge=10)
+    ollama_num_parallel: int = Field(
+        default=4, 
+        description="并发嵌入请求数，应与Ollama服务端的OLLAMA_NUM_PARALLEL一致", 
+        ge=1
+    )
     embedding_model: str = Field(
         default="mitoza/Qwen3-Embedding-0.6B:latest",  # 使用可用的嵌入模型
         description="嵌入模型名称"
@@ -73,7 +96,24 @@ class Settings(BaseSettings):
     
     # ============ 向量配置 ============
     vector_dim: int = Field(default=1024, description="向量维度", ge=128, le=4096)
+    vector_dtype: VectorDType = Field(
+        default=VectorDType.FLOAT32, 
+        description="向量存储精度，bfloat16可减半存储和传输量"
+    )
     use_flat_index: bool = Field(default=True, description="是否使用FLAT索引")
+    index_type: Optional[IndexType] = Field(
+        default=None, 
+        description="向量索引类型，未设置时按use_flat_index选择FLAT或IVF_FLAT"
+    )
+    ivf_nlist: int = Field(default=128, description="IVF索引聚类中心数，约为数据量的平方根", ge=1, le=65536)
+    ivf_use_l2: bool = Field(default=True, description="IVF索引下以单位向量的L2距离代替COSINE/IP")
+    ivf_nprobe: int = Field(default=16, description="IVF索引搜索时探查的聚类数，越大召回越高", ge=1, le=65536)
+    pq_m: int = Field(default=16, description="IVF_PQ子空间数，需整除向量维度", ge=1)
+    pq_nbits: int = Field(default=8, description="IVF_PQ每个子空间的编码位数", ge=1, le=16)
+    pq_rerank_factor: int = Field(default=4, description="IVF_PQ搜索时取top_k的倍数作为候选再精确重排", ge=1)
+    hnsw_m: int = Field(default=16, description="HNSW每个节点的最大连接数", ge=2, le=2048)
+    hnsw_ef_construction: int = Field(default=200, description="HNSW建索引时的候选列表长度", ge=1)
+    hnsw_ef: int = Field(default=64, description="HNSW搜索时的候选列表长度，不小于top_k", ge=1)
     similarity_metric: str = Field(default="COSINE", description="相似度度量方式")
     top_k: int = Field(default=5, description="检索返回结果数量", ge=1, le=100)
     
@@ -105,6 +145,9 @@ class Settings(BaseSettings):
     # ============ 性能配置 ============
     batch_size: int = Field(default=100, description="批处理大小", ge=1, le=1000)
     max_workers: int = Field(default=4, description="最大工作线程数", ge=1, le=32)
+    upsert_auto_tune: bool = Field(default=True, description="按写入吞吐自动调整upsert批大小")
+    embedding_batch_min: int = Field(default=1, description="嵌入请求批大小下限", ge=1)
+    embedding_batch_max: int = Field(default=256, description="嵌入请求批大小上限", ge=1)
     cache_size: int = Field(default=1000, description="缓存大小", ge=0)
     
     # ============ 安全配置 ============
@@ -156,6 +199,12 @@ class Settings(BaseSettings):
         else:
             return self.db_path
     
+    def get_index_type(self) -> str:
+        """获取生效的向量索引类型"""
+        if self.index_type is not None:
+            return self.index_type.value
+        return IndexType.FLAT.value if self.use_flat_index else IndexType.IVF_FLAT.value
+    
     def get_ollama_config(self) -> Dict[str, Any]:
         """获取Ollama配置"""
         return {
@@ -193,13 +242,16 @@ def create_settings(**overrides) -> Settings:
     """
     创建配置实例的工厂函数
     
+    以全局配置的字段值为基础合并覆盖项后整体校验，得到独立的新实例
+    （列表等可变字段不与全局配置共享），且不重新读取环境变量。
+    
     Args:
         **overrides: 覆盖的配置项
         
     Returns:
         Settings: 配置实例
     """
-    return Settings(**overrides)
+    return Settings.model_validate({**settings.model_dump(), **overrides})
 
 
 # 全局配置实例
@@ -3,22 +3,83 @@
 支持异步处理、缓存、重试机制和更好的错误处理
 """
 import re
-import json
 import asyncio
 import hashlib
+import queue
+import sqlite3
+import functools
+import threading
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple, Union
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
 from enum import Enum
 import time
+import warnings
 
+import httpx
+import numpy as np
 import ollama
+import orjson
 from tqdm import tqdm
 
 from .config import settings
-from .utils import get_logger, safe_operation
-from .vector_db import BaseVectorDB, VectorDBError, SearchResult
+from .utils import get_logger
+from .vector_db import BaseVectorDB
+
+__all__ = [
+    "ProcessingStatus",
+    "ProcessingResult",
+    "SQLiteEmbeddingCache",
+    "DataProcessingError",
+    "EmbeddingError",
+    "DataHelper",
+]
+
+
+# 自适应批大小：连续成功多少个批次后尝试翻倍
+_BATCH_GROW_AFTER = 5
+# 最小批次失败时的重试次数和首次退避秒数（之后每次翻倍）
+_FLOOR_RETRY_COUNT = 3
+_FLOOR_RETRY_BACKOFF = 0.5
+# 值得重试的Ollama响应状态码：413请求过大、429限流、5xx服务端错误；
+# 其余4xx（模型不存在、输入无效、未授权）重试也不会成功，立即抛出
+_RETRYABLE_STATUS = frozenset({413, 429})
+
+# 文本清理使用的正则，在模块加载时编译一次
+_WHITESPACE_RE = re.compile(r'\s+')
+_DISALLOWED_CHARS_RE = re.compile(r'[^\w\u4e00-\u9fff0-9\.,!?；：""''（）【】\\s\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF]+')
+_REPEATED_PUNCT_RE = re.compile(r'([,.!?；：])\1+')
+# clean_many的拼接分隔符：会被_DISALLOWED_CHARS_RE保留，且不是空白或标点
+_CLEAN_SEPARATOR = '\U0001F6FF'
+
+# 知识项中需要原样复制到元数据的可选字段
+_KNOWLEDGE_EXTRA_KEYS = frozenset({"description", "examples", "keywords", "confidence", "source"})
+
+# 反馈项中不复制到元数据的字段（已单独存储）
+_FEEDBACK_RESERVED_KEYS = frozenset({"raw_text", "summary"})
+
+# 反馈处理流水线中表示上游阶段已结束的哨兵
+_PIPELINE_DONE = object()
+# 流水线线程在队列上等待时检查停止信号的间隔（秒）
+_PIPELINE_POLL_INTERVAL = 0.1
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_ollama_client(host: Optional[str], timeout: Optional[float]) -> ollama.Client:
+    """按 (host, timeout) 复用Ollama客户端，进程内所有DataHelper共享同一个keep-alive连接池"""
+    pool_size = max(settings.max_workers, settings.ollama_num_parallel)
+    return ollama.Client(
+        host=host,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=pool_size * 2, max_keepalive_connections=pool_size)
+    )
+
+
+def _read_json_file(path: Path) -> Any:
+    """读取并解析单个JSON文件"""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
 
 
 class ProcessingStatus(str, Enum):
@@ -43,16 +104,89 @@ class ProcessingResult:
         return asdict(self)
 
 
+class SQLiteEmbeddingCache:
+    """
+    基于SQLite的持久化嵌入缓存
+    
+    以 (模型, 文本) 的blake2b摘要为键，向量以float32字节存储。
+    嵌入对同一模型和文本是确定的，重复导入时直接命中缓存。
+    """
+    
+    # SQLite单条语句的参数个数有限，批量查询时分段
+    _QUERY_CHUNK_SIZE = 500
+    
+    def __init__(self, path: Path):
+        """
+        打开（或创建）缓存数据库
+        
+        Args:
+            path: SQLite数据库文件路径
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB NOT NULL)"
+            )
+            self._conn.commit()
+    
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        """计算 (模型, 文本) 的缓存键"""
+        return hashlib.blake2b(f"{model}\n{text}".encode("utf-8"), digest_size=16).hexdigest()
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """查询单个向量，未命中返回None"""
+        return self.get_many([key]).get(key)
+    
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """批量查询向量，只返回命中的键"""
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for start in range(0, len(keys), self._QUERY_CHUNK_SIZE):
+                chunk = keys[start:start + self._QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vec FROM embeddings WHERE key IN ({placeholders})", chunk
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+    
+    def put_many(self, items: List[Tuple[str, np.ndarray]]) -> None:
+        """批量写入向量"""
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
 @dataclass
-class EmbeddingCache:
-    """嵌入缓存数据类"""
+class _LegacyEmbeddingCache:
+    """旧版JSON嵌入缓存的数据类，已不再使用，仅为兼容以 ``EmbeddingCache`` 的名称保留"""
     text_hash: str
     embedding: List[float]
     model: str
     timestamp: float
     
     @classmethod
-    def from_text(cls, text: str, embedding: List[float], model: str) -> 'EmbeddingCache':
+    def from_text(cls, text: str, embedding: List[float], model: str) -> '_LegacyEmbeddingCache':
         """从文本创建缓存对象"""
         text_hash = hashlib.md5(text.encode('utf-8')).hexdigest()
         return cls(
@@ -93,11 +227,6 @@ class DataHelper:
         self.cache_dir = cache_dir or settings.embeddings_dir
         self.logger = get_logger("DataHelper")
         
-        # 初始化缓存
-        self._embedding_cache: Dict[str, EmbeddingCache] = {}
-        if self.enable_cache:
-            self._load_cache()
-        
         # 配置Ollama客户端
         self._setup_ollama_client()
         
@@ -105,6 +234,16 @@ class DataHelper:
         if not hasattr(self, 'embedding_model'):
             self.embedding_model = settings.embedding_model
         
+        # 初始化缓存
+        self._cache: Optional[SQLiteEmbeddingCache] = None
+        if self.enable_cache:
+            self._open_cache()
+        
+        # 自适应嵌入批大小，从全局批大小出发，限制在[min, max]之间
+        self.batch_size = min(max(settings.batch_size, settings.embedding_batch_min),
+                              settings.embedding_batch_max)
+        self._successes_at_size = 0
+        
         # 性能统计
         self.stats = {
             "cache_hits": 0,
@@ -118,57 +257,48 @@ class DataHelper:
         """设置Ollama客户端"""
         try:
             ollama_config = settings.get_ollama_config()
-            self.ollama_client = ollama.Client(
-                host=ollama_config["host"],
-                timeout=ollama_config.get("timeout", 300)
-            )
+            self.ollama_host = ollama_config["host"]
+            self.ollama_timeout = ollama_config.get("timeout", 300)
+            self.ollama_client = _shared_ollama_client(self.ollama_host, self.ollama_timeout)
             self.embedding_model = ollama_config["model"]
             self.logger.info("Ollama客户端配置成功", 
                            host=ollama_config["host"],
                            model=self.embedding_model)
         except Exception as e:
             self.logger.warning("Ollama客户端配置失败，使用默认配置", error=str(e))
-            self.ollama_client = ollama.Client()
+            self.ollama_host = None
+            self.ollama_timeout = None
+            self.ollama_client = _shared_ollama_client(None, None)
             self.embedding_model = settings.embedding_model
     
-    def _load_cache(self) -> None:
-        """加载嵌入缓存"""
+    def _open_cache(self) -> None:
+        """打开嵌入缓存"""
         try:
-            cache_file = self.cache_dir / f"embeddings_{self.embedding_model.replace(':', '_')}.json"
-            if cache_file.exists():
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-                    
-                for item in cache_data:
-                    cache_obj = EmbeddingCache(**item)
-                    self._embedding_cache[cache_obj.text_hash] = cache_obj
-                    
-                self.logger.info("嵌入缓存加载成功", 
-                               cache_size=len(self._embedding_cache),
-                               cache_file=str(cache_file))
+            self._cache = SQLiteEmbeddingCache(self.cache_dir / "embeddings.sqlite3")
+            self.logger.info("嵌入缓存打开成功", 
+                           cache_size=len(self._cache),
+                           cache_file=str(self._cache.path))
+            # 旧版JSON缓存只以文本的md5为键，无法换算成新键，不再读取
+            legacy_files = sorted(self.cache_dir.glob("embeddings_*.json"))
+            if legacy_files:
+                self.logger.warning("发现旧版JSON嵌入缓存，已不再使用，可以删除", 
+                                  legacy_files=[str(path) for path in legacy_files])
         except Exception as e:
-            self.logger.warning("加载嵌入缓存失败", error=str(e))
-            self._embedding_cache = {}
+            self.logger.warning("打开嵌入缓存失败", error=str(e))
+            self._cache = None
+    
+    def _cache_key(self, text: str) -> str:
+        """计算当前模型下文本的缓存键"""
+        return SQLiteEmbeddingCache.make_key(self.embedding_model, text)
     
-    def _save_cache(self) -> None:
-        """保存嵌入缓存"""
-        if not self.enable_cache or not self._embedding_cache:
+    def _store_cache(self, items: List[Tuple[str, np.ndarray]]) -> None:
+        """写入嵌入缓存，失败只记录日志"""
+        if self._cache is None or not items:
             return
-            
         try:
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
-            cache_file = self.cache_dir / f"embeddings_{self.embedding_model.replace(':', '_')}.json"
-            
-            cache_data = [asdict(cache_obj) for cache_obj in self._embedding_cache.values()]
-            
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-                
-            self.logger.info("嵌入缓存保存成功", 
-                           cache_size=len(self._embedding_cache),
-                           cache_file=str(cache_file))
+            self._cache.put_many(items)
         except Exception as e:
-            self.logger.error("保存嵌入缓存失败", error=str(e))
+            self.logger.warning("写入嵌入缓存失败", error=str(e))
     
     def get_stats(self) -> Dict[str, Any]:
         """获取性能统计信息"""
@@ -200,13 +330,13 @@ class DataHelper:
             text = text.strip()
             
             # 标准化空白字符
-            text = re.sub(r'\s+', ' ', text)
+            text = _WHITESPACE_RE.sub(' ', text)
             
             # 保留中英文、数字、常用标点符号和表情符号
-            text = re.sub(r'[^\w\u4e00-\u9fff0-9\.,!?；：""''（）【】\\s\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF]', '', text)
+            text = _DISALLOWED_CHARS_RE.sub('', text)
             
             # 处理重复标点
-            text = re.sub(r'([,.!?；：])\1+', r'\1', text)
+            text = _REPEATED_PUNCT_RE.sub(r'\1', text)
             
             # 最终清理
             text = text.strip()
@@ -217,6 +347,31 @@ class DataHelper:
             self.logger.warning("文本清理失败", text_preview=text[:100], error=str(e))
             return text or ""
     
+    def clean_many(self, texts: Iterable[str]) -> List[str]:
+        """
+        批量文本清理，结果与逐条调用 clean_text 一致
+        
+        用分隔符把所有文本拼成一个字符串，每条正则只执行一次再按分隔符切回。
+        分隔符是允许保留的非空白、非标点字符，任何一条正则的匹配都不会跨过它；
+        含分隔符或非字符串的输入退回逐条清理。
+        
+        Args:
+            texts: 原始文本序列
+            
+        Returns:
+            List[str]: 清理后的文本列表
+        """
+        texts = list(texts)
+        if len(texts) < 2 or not all(
+            isinstance(text, str) and _CLEAN_SEPARATOR not in text for text in texts
+        ):
+            return [self.clean_text(text) for text in texts]
+        
+        joined = _WHITESPACE_RE.sub(' ', _CLEAN_SEPARATOR.join(texts))
+        joined = _DISALLOWED_CHARS_RE.sub('', joined)
+        joined = _REPEATED_PUNCT_RE.sub(r'\1', joined)
+        return [text.strip() for text in joined.split(_CLEAN_SEPARATOR)]
+    
     def load_data_from_directory(self, 
                                 data_type: str, 
                                 directory: Path, 
@@ -251,13 +406,15 @@ class DataHelper:
             all_data = []
             failed_files = []
             
-            # 使用进度条
-            with tqdm(json_files, desc=f"加载{data_type}数据", unit="file") as pbar:
-                for json_file in pbar:
+            # 在线程池中并行读取和解析文件，按文件顺序收集结果
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(json_files))) as executor, \
+                 tqdm(total=len(json_files), desc=f"加载{data_type}数据", unit="file") as pbar:
+                futures = [executor.submit(_read_json_file, json_file) for json_file in json_files]
+                
+                for json_file, future in zip(json_files, futures):
                     try:
-                        with open(json_file, 'r', encoding='utf-8') as f:
-                            file_data = json.load(f)
-                            
+                        file_data = future.result()
+                        
                         if isinstance(file_data, list):
                             all_data.extend(file_data)
                             record_count = len(file_data)
@@ -276,7 +433,8 @@ class DataHelper:
                         self.logger.error("文件加载失败", 
                                         file=str(json_file),
                                         error=str(e))
-                        continue
+                    
+                    pbar.update(1)
             
             if failed_files:
                 self.logger.warning("部分文件加载失败", 
@@ -332,13 +490,13 @@ class DataHelper:
             
             # 处理例子
             if examples:
-                cleaned_examples = [self.clean_text(ex) for ex in examples[:3] if ex]
+                cleaned_examples = self.clean_many(ex for ex in examples[:3] if ex)
                 if cleaned_examples:
                     text_parts.append(f"例子：{' | '.join(cleaned_examples)}")
             
             # 处理关键词
             if keywords:
-                cleaned_keywords = [self.clean_text(kw) for kw in keywords if kw]
+                cleaned_keywords = self.clean_many(kw for kw in keywords if kw)
                 if cleaned_keywords:
                     text_parts.append(f"关键词：{' '.join(cleaned_keywords)}")
             
@@ -387,7 +545,96 @@ class DataHelper:
                             error=str(e))
             return raw_text or "处理失败"
     
-    def embed_text(self, text: str, retry_count: int = 3) -> Optional[List[float]]:
+    def _lookup_cache(self, key: str) -> Optional[np.ndarray]:
+        """查询嵌入缓存并更新命中统计"""
+        embedding = self._cache.get(key) if self._cache is not None else None
+        if embedding is not None:
+            self.stats["cache_hits"] += 1
+        else:
+            self.stats["cache_misses"] += 1
+        return embedding
+    
+    def _embed_chunk(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        单次请求批量向量化，并自适应调整批大小
+        
+        请求过大（413）、服务端错误（5xx）或超时时将批次对半拆分后递归重试，
+        批大小按失败批次的一半下调；已是最小批大小的批次按指数退避重试 ``_FLOOR_RETRY_COUNT`` 次。
+        限流（429）和连接失败与批大小无关，不拆分，原批次退避重试。
+        其他4xx错误直接抛出，不做重试。
+        连续成功若干批次后批大小翻倍，直至 ``embedding_batch_max``。
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            List[Optional[np.ndarray]]: float32向量列表，重试仍失败的项为None
+            
+        Raises:
+            ollama.ResponseError: 不可重试的4xx错误
+        """
+        floor = max(1, settings.embedding_batch_min)
+        
+        for attempt in range(_FLOOR_RETRY_COUNT):
+            try:
+                start_time = time.time()
+                response = self.ollama_client.embed(
+                    model=self.embedding_model,
+                    input=texts,
+                )
+                embedding_time = time.time() - start_time
+                break
+            except (ollama.ResponseError, httpx.TransportError, ConnectionError) as e:
+                if isinstance(e, ollama.ResponseError) and not (
+                        e.status_code in _RETRYABLE_STATUS or e.status_code >= 500):
+                    self.logger.error("向量化请求被拒绝，不再重试",
+                                    status_code=e.status_code,
+                                    error=str(e))
+                    raise
+                
+                self.stats["errors"] += 1
+                self._successes_at_size = 0
+                # 只有请求过大、服务端错误和超时可能与批大小有关
+                size_related = (isinstance(e, httpx.TimeoutException) 
+                                or (isinstance(e, ollama.ResponseError) and e.status_code != 429))
+                
+                if size_related and len(texts) > floor:
+                    # 按本次失败的批次计算新批大小，兄弟子批次失败时不会重复减半
+                    half = len(texts) // 2
+                    self.batch_size = max(settings.embedding_batch_min, min(self.batch_size, half))
+                    self.logger.warning("批量向量化失败，拆分批次重试",
+                                      batch_size=len(texts),
+                                      next_batch_size=self.batch_size,
+                                      error=str(e))
+                    return self._embed_chunk(texts[:half]) + self._embed_chunk(texts[half:])
+                
+                if attempt < _FLOOR_RETRY_COUNT - 1:
+                    self.logger.warning("向量化失败，退避后重试",
+                                      batch_size=len(texts),
+                                      attempt=attempt + 1,
+                                      error=str(e))
+                    time.sleep(_FLOOR_RETRY_BACKOFF * 2 ** attempt)
+                    continue
+                
+                self.logger.error("批量向量化失败",
+                                batch_size=len(texts),
+                                error=str(e))
+                return [None] * len(texts)
+        
+        self.stats["processing_time"] += embedding_time
+        self.stats["embeddings_generated"] += len(texts)
+        
+        # 连续成功后尝试更大的批次
+        self._successes_at_size += 1
+        if self._successes_at_size >= _BATCH_GROW_AFTER and self.batch_size < settings.embedding_batch_max:
+            self.batch_size = min(settings.embedding_batch_max, self.batch_size * 2)
+            self._successes_at_size = 0
+            self.logger.debug("嵌入批大小上调", batch_size=self.batch_size)
+        
+        # 离开HTTP响应后立即转为float32数组，只在JSON序列化边界才转回列表
+        return list(np.asarray(response["embeddings"], dtype=np.float32))
+    
+    def embed_text(self, text: str, retry_count: int = 3) -> Optional[np.ndarray]:
         """
         文本向量化，支持缓存和重试
         
@@ -396,22 +643,18 @@ class DataHelper:
             retry_count: 重试次数
             
         Returns:
-            Optional[List[float]]: 向量，失败时返回None
+            Optional[np.ndarray]: float32向量，失败时返回None
         """
         if not text or not text.strip():
             self.logger.warning("文本为空，跳过向量化")
             return None
         
         # 检查缓存
-        text_hash = hashlib.md5(text.encode('utf-8')).hexdigest()
-        if self.enable_cache and text_hash in self._embedding_cache:
-            cache_obj = self._embedding_cache[text_hash]
-            if cache_obj.model == self.embedding_model:
-                self.stats["cache_hits"] += 1
-                self.logger.debug("使用缓存嵌入", text_length=len(text))
-                return cache_obj.embedding
-        
-        self.stats["cache_misses"] += 1
+        cache_key = self._cache_key(text)
+        cached = self._lookup_cache(cache_key)
+        if cached is not None:
+            self.logger.debug("使用缓存嵌入", text_length=len(text))
+            return cached
         
         # 生成嵌入
         for attempt in range(retry_count):
@@ -427,12 +670,10 @@ class DataHelper:
                 self.stats["processing_time"] += embedding_time
                 self.stats["embeddings_generated"] += 1
                 
-                embedding = response["embeddings"][0]
+                embedding = np.asarray(response["embeddings"][0], dtype=np.float32)
                 
                 # 保存到缓存
-                if self.enable_cache:
-                    cache_obj = EmbeddingCache.from_text(text, embedding, self.embedding_model)
-                    self._embedding_cache[text_hash] = cache_obj
+                self._store_cache([(cache_key, embedding)])
                 
                 self.logger.debug("文本向量化成功", 
                                 text_length=len(text),
@@ -444,7 +685,9 @@ class DataHelper:
                 
             except Exception as e:
                 self.stats["errors"] += 1
-                self.logger.warning(f"向量化失败 (尝试 {attempt + 1}/{retry_count})", 
+                self.logger.warning("向量化失败", 
+                                  attempt=attempt + 1,
+                                  retry_count=retry_count,
                                   error=str(e),
                                   text_preview=text[:100])
                 
@@ -459,70 +702,176 @@ class DataHelper:
         
         return None
     
-    def embed_batch(self, texts: List[str], show_progress: bool = True) -> List[Optional[List[float]]]:
+    def embed_batch(self, texts: List[str], show_progress: bool = True) -> List[Optional[np.ndarray]]:
         """
-        批量文本向量化，支持并行处理和进度显示
+        批量文本向量化，按自适应批大小调用Ollama批量接口
         
         Args:
             texts: 文本列表
             show_progress: 是否显示进度条
             
         Returns:
-            List[Optional[List[float]]]: 向量列表
+            List[Optional[np.ndarray]]: float32向量列表
         """
         if not texts:
             return []
         
-        self.logger.info("开始批量向量化", text_count=len(texts))
+        self.logger.debug("开始批量向量化", text_count=len(texts))
         
-        embeddings = [None] * len(texts)
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
         
-        # 使用线程池并行处理
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # 提交所有任务
-            future_to_index = {
-                executor.submit(self.embed_text, text): i 
-                for i, text in enumerate(texts)
-            }
+        # 重复文本只处理一次
+        positions: Dict[str, Tuple[str, List[int]]] = {}
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            cache_key = self._cache_key(text)
+            if cache_key in positions:
+                positions[cache_key][1].append(i)
+            else:
+                positions[cache_key] = (text, [i])
+        
+        # 一次查询全部缓存，只对未命中的文本发起请求
+        cached = self._cache.get_many(list(positions)) if self._cache is not None else {}
+        pending_items: List[Tuple[str, str, List[int]]] = []
+        for cache_key, (text, indices) in positions.items():
+            embedding = cached.get(cache_key)
+            if embedding is not None:
+                self.stats["cache_hits"] += len(indices)
+                for index in indices:
+                    embeddings[index] = embedding
+            else:
+                self.stats["cache_misses"] += len(indices)
+                pending_items.append((cache_key, text, indices))
+        
+        pending_count = sum(len(indices) for _, _, indices in pending_items)
+        
+        progress_bar = tqdm(total=len(texts), initial=len(texts) - pending_count,
+                            desc="向量化进度", unit="text") if show_progress else None
+        
+        position = 0
+        while position < len(pending_items):
+            chunk = pending_items[position:position + self.batch_size]
+            position += len(chunk)
             
-            # 收集结果，显示进度
-            completed = 0
-            progress_bar = tqdm(total=len(texts), desc="向量化进度", unit="text") if show_progress else None
+            # 可重试的错误（服务端错误、超时、限流、连接失败）已在_embed_chunk中处理为None；
+            # 其他异常（模型不存在等4xx、响应格式不符）说明调用本身有问题，直接抛出，
+            # 而不是让所有批次静默失败
+            try:
+                vectors = self._embed_chunk([text for _, text, _ in chunk])
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.error("批量向量化中单个批次失败", 
+                                batch_size=len(chunk),
+                                error=str(e))
+                if progress_bar:
+                    progress_bar.close()
+                raise EmbeddingError(f"批量向量化失败: {e!r}") from e
             
-            for future in as_completed(future_to_index):
-                index = future_to_index[future]
-                try:
-                    embedding = future.result()
+            for (_, _, indices), embedding in zip(chunk, vectors):
+                for index in indices:
                     embeddings[index] = embedding
-                except Exception as e:
-                    self.logger.error("批量向量化中单个任务失败", 
-                                    index=index,
-                                    error=str(e))
-                    embeddings[index] = None
-                
-                completed += 1
-                if progress_bar:
-                    progress_bar.update(1)
-                    progress_bar.set_postfix({
-                        "成功": sum(1 for e in embeddings[:completed] if e is not None),
-                        "失败": sum(1 for e in embeddings[:completed] if e is None)
-                    })
+            
+            self._store_cache([
+                (cache_key, embedding)
+                for (cache_key, _, _), embedding in zip(chunk, vectors)
+                if embedding is not None
+            ])
             
             if progress_bar:
-                progress_bar.close()
+                progress_bar.update(sum(len(indices) for _, _, indices in chunk))
+                progress_bar.set_postfix({"批大小": self.batch_size})
         
-        # 保存缓存
-        if self.enable_cache:
-            self._save_cache()
+        if progress_bar:
+            progress_bar.close()
+        
+        embeddings = self._pack_rows(embeddings)
         
         success_count = sum(1 for emb in embeddings if emb is not None)
-        self.logger.info("批量向量化完成", 
+        self.logger.debug("批量向量化完成", 
                         total_count=len(texts),
                         success_count=success_count,
                         failure_count=len(texts) - success_count)
         
         return embeddings
     
+    @staticmethod
+    def _pack_rows(embeddings: List[Optional[np.ndarray]]) -> List[Optional[np.ndarray]]:
+        """
+        将向量拷贝到一块连续的 (N, D) float32 矩阵中，返回其行视图
+        
+        失败的位置仍为None；缓存命中与各批次的向量因此共享同一块内存，
+        写入Milvus时也无需逐行重新编码。
+        """
+        rows = [i for i, emb in enumerate(embeddings) if emb is not None]
+        if not rows:
+            return embeddings
+        
+        matrix = np.empty((len(embeddings), len(embeddings[rows[0]])), dtype=np.float32)
+        for i in rows:
+            matrix[i] = embeddings[i]
+        
+        packed: List[Optional[np.ndarray]] = [None] * len(embeddings)
+        for i in rows:
+            packed[i] = matrix[i]
+        return packed
+    
+    async def aembed_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        并发向量化多个文本，每个文本单独请求
+        
+        适用于无法合并为批量请求的场景（如超长文本、流式写入），
+        最多同时发出 settings.ollama_num_parallel 个请求。
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            List[Optional[np.ndarray]]: float32向量列表，失败项为None
+        """
+        if not texts:
+            return []
+        
+        semaphore = asyncio.Semaphore(settings.ollama_num_parallel)
+        
+        # 异步客户端绑定事件循环，因此按调用创建，连接池大小与并发数一致
+        limits = httpx.Limits(max_keepalive_connections=settings.ollama_num_parallel)
+        async with ollama.AsyncClient(host=self.ollama_host, timeout=self.ollama_timeout,
+                                      limits=limits) as client:
+            async def _embed_one(text: str) -> Optional[np.ndarray]:
+                if not text or not text.strip():
+                    return None
+                
+                cache_key = self._cache_key(text)
+                cached = self._lookup_cache(cache_key)
+                if cached is not None:
+                    return cached
+                
+                async with semaphore:
+                    try:
+                        start_time = time.time()
+                        response = await client.embed(model=self.embedding_model, input=text)
+                        embedding_time = time.time() - start_time
+                    except Exception as e:
+                        self.stats["errors"] += 1
+                        self.logger.warning("异步向量化失败", 
+                                          error=str(e),
+                                          text_preview=text[:100])
+                        return None
+                
+                self.stats["processing_time"] += embedding_time
+                self.stats["embeddings_generated"] += 1
+                
+                embedding = np.asarray(response["embeddings"][0], dtype=np.float32)
+                self._store_cache([(cache_key, embedding)])
+                return embedding
+            
+            return list(await asyncio.gather(*(_embed_one(text) for text in texts)))
+    
+    def embed_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """aembed_many的同步封装，不能在运行中的事件循环内调用"""
+        return asyncio.run(self.aembed_many(texts))
+    
     def build_dictionary(self, 
                         data_type: str, 
                         data: List[Dict[str, Any]], 
@@ -560,46 +909,53 @@ class DataHelper:
         self.logger.info("开始构建知识数据字典", record_count=len(data))
         
         # 准备文本
-        texts = []
-        for item in data:
-            text = self.build_knowledge_text(item)
-            texts.append(text)
+        build_text = self.build_knowledge_text
+        texts = [build_text(item) for item in data]
         
         # 批量向量化
         embeddings = self.embed_batch(texts, show_progress=True)
         
-        # 构建结果
-        knowledge_dictionary = []
-        for i, (item, embedding) in enumerate(zip(data, embeddings)):
+        # 所有记录共享的元数据字段
+        meta_template = {
+            "type": "knowledge",
+            "created_time": time.time(),
+            "model": self.embedding_model,
+        }
+        
+        # 构建结果：预分配输出，循环内只使用局部变量
+        knowledge_dictionary: List[Optional[Dict[str, Any]]] = [None] * len(data)
+        new_meta = meta_template.copy
+        extra_keys = _KNOWLEDGE_EXTRA_KEYS
+        warn = self.logger.warning
+        
+        for i, (item, text, embedding) in enumerate(zip(data, texts, embeddings)):
+            get = item.get
             if embedding is None:
-                self.logger.warning("跳过向量化失败的项", 
-                                  item_id=item.get("insight_id", f"index_{i}"))
+                warn("跳过向量化失败的项", item_id=get("insight_id", f"index_{i}"))
                 continue
             
             # 增强元数据
-            meta = {
-                "type": "knowledge",
-                "aspect": item.get("aspect", ""),
-                "insight": item.get("insight", ""),
-                "sentiment": item.get("sentiment", ""),
-                "status": item.get("status", "active"),
-                "created_time": time.time(),
-                "model": self.embedding_model,
-                "text_length": len(texts[i]),
-                "embedding_dim": len(embedding)
-            }
+            meta = new_meta()
+            meta.update(
+                aspect=get("aspect", ""),
+                insight=get("insight", ""),
+                sentiment=get("sentiment", ""),
+                status=get("status", "active"),
+                text_length=len(text),
+                embedding_dim=len(embedding),
+            )
             
             # 添加额外字段
-            for key in ["description", "examples", "keywords", "confidence", "source"]:
-                if key in item:
-                    meta[key] = item[key]
+            meta.update({key: value for key, value in item.items() if key in extra_keys})
             
-            knowledge_dictionary.append({
-                "id": str(item.get("insight_id", f"knowledge_{i}")),
+            knowledge_dictionary[i] = {
+                "id": str(get("insight_id", f"knowledge_{i}")),
                 "vector": embedding,
-                "text_for_embedding": texts[i],
+                "text_for_embedding": text,
                 "metadata": meta,
-            })
+            }
+        
+        knowledge_dictionary = [entry for entry in knowledge_dictionary if entry is not None]
         
         self.logger.info("知识数据字典构建完成", 
                         input_count=len(data),
@@ -614,76 +970,152 @@ class DataHelper:
         self.logger.info("开始构建反馈数据字典", record_count=len(data))
         
         # 准备文本
-        texts = []
-        for item in data:
-            raw_text = item.get("raw_text", "")
-            summary = item.get("summary")
-            text = self.build_feedback_text(raw_text, summary)
-            texts.append(text)
+        build_text = self.build_feedback_text
+        texts = [build_text(item.get("raw_text", ""), item.get("summary")) for item in data]
         
-        # 批量向量化
-        embeddings = self.embed_batch(texts, show_progress=True)
+        # 所有记录共享的元数据字段
+        meta_template = {
+            "type": "feedback",
+            "created_time": time.time(),
+            "model": self.embedding_model,
+        }
         
-        # 构建结果
-        feedback_corpus = []
-        for i, (item, embedding) in enumerate(zip(data, embeddings)):
-            if embedding is None:
-                self.logger.warning("跳过向量化失败的项", 
-                                  item_id=item.get("fb_id", f"index_{i}"))
-                continue
-            
-            raw_text = item.get("raw_text", "")
-            summary = item.get("summary")
-            
-            # 搜索匹配的观点
+        # 三段流水线：向量化 -> 观点检索 -> 构建结果，按批在不同线程中重叠执行，
+        # 总耗时接近最慢的一段而不是三段之和
+        chunk_size = settings.batch_size
+        embedded: queue.Queue = queue.Queue(maxsize=2)
+        searched: queue.Queue = queue.Queue(maxsize=2)
+        # 任一段出错或消费端退出时置位，上游线程据此停止，不会阻塞在已满的队列上
+        stop = threading.Event()
+        
+        def offer(target: queue.Queue, item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=_PIPELINE_POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def take(source: queue.Queue) -> Any:
+            while not stop.is_set():
+                try:
+                    return source.get(timeout=_PIPELINE_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+            return _PIPELINE_DONE
+        
+        # 两段都捕获BaseException并转交下游：线程因任何原因退出前都会投递异常或结束标记，
+        # 消费端不会一直等不到结果
+        def embed_stage() -> None:
             try:
-                search_results = local_db.search("knowledge", [embedding], top_k=5)
-                if search_results and len(search_results) > 0:
-                    mapped_perspectives = [
-                        {
-                            "id": result.id,
-                            "score": result.score,
-                            "insight": result.metadata.get("insight", ""),
-                            "aspect": result.metadata.get("aspect", "")
+                for start in range(0, len(texts), chunk_size):
+                    if stop.is_set():
+                        return
+                    job = (start, self.embed_batch(texts[start:start + chunk_size], show_progress=False))
+                    if not offer(embedded, job):
+                        return
+            except BaseException as e:
+                offer(embedded, e)
+                return
+            offer(embedded, _PIPELINE_DONE)
+        
+        def search_stage() -> None:
+            try:
+                while True:
+                    job = take(embedded)
+                    if job is _PIPELINE_DONE or isinstance(job, BaseException):
+                        offer(searched, job)
+                        return
+                    start, embeddings = job
+                    valid_offsets = [j for j, embedding in enumerate(embeddings) if embedding is not None]
+                    mapped = self._search_perspectives(local_db, [embeddings[j] for j in valid_offsets])
+                    if not offer(searched, (start, embeddings, dict(zip(valid_offsets, mapped)))):
+                        return
+            except BaseException as e:
+                offer(searched, e)
+        
+        def collect() -> Any:
+            # 与上游一样按间隔轮询；两段线程都已退出且队列已空时不再等待
+            while True:
+                try:
+                    return searched.get(timeout=_PIPELINE_POLL_INTERVAL)
+                except queue.Empty:
+                    if not any(stage.is_alive() for stage in stages) and searched.empty():
+                        raise DataProcessingError("反馈处理流水线线程意外退出")
+        
+        stages = [
+            threading.Thread(target=embed_stage, name="feedback-embed", daemon=True),
+            threading.Thread(target=search_stage, name="feedback-search", daemon=True),
+        ]
+        for stage in stages:
+            stage.start()
+        
+        # 构建结果：预分配输出，循环内只使用局部变量
+        feedback_corpus: List[Optional[Dict[str, Any]]] = [None] * len(data)
+        new_meta = meta_template.copy
+        reserved_keys = _FEEDBACK_RESERVED_KEYS
+        warn = self.logger.warning
+        info = self.logger.info
+        
+        try:
+            with tqdm(total=len(data), desc="反馈处理进度", unit="item") as progress_bar:
+                while True:
+                    job = collect()
+                    if job is _PIPELINE_DONE:
+                        break
+                    if isinstance(job, BaseException):
+                        raise job
+                    
+                    start, embeddings, mapped_by_offset = job
+                    for offset, embedding in enumerate(embeddings):
+                        i = start + offset
+                        item, text = data[i], texts[i]
+                        get = item.get
+                        if embedding is None:
+                            warn("跳过向量化失败的项", item_id=get("fb_id", f"index_{i}"))
+                            continue
+                        
+                        raw_text = get("raw_text", "")
+                        mapped_perspectives = mapped_by_offset[offset]
+                        
+                        # 记录匹配结果
+                        if mapped_perspectives:
+                            info("反馈映射成功", 
+                                 raw_text_preview=raw_text[:50],
+                                 match_count=len(mapped_perspectives))
+                        
+                        # 增强元数据
+                        meta = new_meta()
+                        meta.update(
+                            raw_text=raw_text,
+                            summary=get("summary"),
+                            mapped_perspectives=mapped_perspectives,
+                            text_length=len(text),
+                            embedding_dim=len(embedding),
+                            match_count=len(mapped_perspectives),
+                        )
+                        
+                        # 添加原始数据的其他字段
+                        meta.update({
+                            key: value for key, value in item.items()
+                            if key not in reserved_keys and not key.startswith("_")
+                        })
+                        
+                        feedback_corpus[i] = {
+                            "id": str(get("fb_id", f"feedback_{i}")),
+                            "vector": embedding,
+                            "text_for_embedding": text,
+                            "metadata": meta,
                         }
-                        for result in search_results[0]
-                    ]
-                else:
-                    mapped_perspectives = []
-            except Exception as e:
-                self.logger.warning("搜索匹配观点失败", 
-                                  item_id=item.get("fb_id", f"index_{i}"),
-                                  error=str(e))
-                mapped_perspectives = []
-            
-            # 记录匹配结果
-            if mapped_perspectives:
-                self.logger.info(f"反馈映射成功: {raw_text[:50]}... -> {len(mapped_perspectives)}个匹配观点")
-            
-            # 增强元数据
-            meta = {
-                "type": "feedback",
-                "raw_text": raw_text,
-                "summary": summary,
-                "mapped_perspectives": mapped_perspectives,
-                "created_time": time.time(),
-                "model": self.embedding_model,
-                "text_length": len(texts[i]),
-                "embedding_dim": len(embedding),
-                "match_count": len(mapped_perspectives)
-            }
-            
-            # 添加原始数据的其他字段
-            for key, value in item.items():
-                if key not in ["raw_text", "summary"] and not key.startswith("_"):
-                    meta[key] = value
-            
-            feedback_corpus.append({
-                "id": str(item.get("fb_id", f"feedback_{i}")),
-                "vector": embedding,
-                "text_for_embedding": texts[i],
-                "metadata": meta,
-            })
+                    
+                    progress_bar.update(len(embeddings))
+        finally:
+            stop.set()
+            for stage in stages:
+                stage.join()
+        
+        feedback_corpus = [entry for entry in feedback_corpus if entry is not None]
         
         self.logger.info("反馈数据字典构建完成", 
                         input_count=len(data),
@@ -691,10 +1123,64 @@ class DataHelper:
         
         return feedback_corpus
     
+    def _search_perspectives(self, 
+                             local_db: BaseVectorDB, 
+                             vectors: List[np.ndarray],
+                             top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        在知识库中批量搜索与反馈向量匹配的观点
+        
+        Args:
+            local_db: 向量数据库实例
+            vectors: 反馈向量列表
+            top_k: 每条反馈返回的观点数量
+            
+        Returns:
+            List[List[Dict]]: 与vectors一一对应的匹配观点列表，搜索失败的批次为空列表
+        """
+        mapped: List[List[Dict[str, Any]]] = []
+        
+        for start in range(0, len(vectors), settings.batch_size):
+            batch = vectors[start:start + settings.batch_size]
+            try:
+                search_results = local_db.search("knowledge", batch, top_k=top_k)
+            except Exception as e:
+                self.logger.warning("搜索匹配观点失败", 
+                                  batch_start=start,
+                                  batch_size=len(batch),
+                                  error=str(e))
+                search_results = []
+            
+            for j in range(len(batch)):
+                hits = search_results[j] if j < len(search_results) else []
+                mapped.append([
+                    {
+                        "id": result.id,
+                        "score": result.score,
+                        "insight": result.metadata.get("insight", ""),
+                        "aspect": result.metadata.get("aspect", "")
+                    }
+                    for result in hits
+                ])
+        
+        return mapped
+    
     def __del__(self):
-        """析构函数，保存缓存"""
+        """析构函数，关闭缓存"""
         try:
-            if hasattr(self, 'enable_cache') and self.enable_cache:
-                self._save_cache()
+            if getattr(self, '_cache', None) is not None:
+                self._cache.close()
         except:
-            pass
\ No newline at end of file
+            pass
+
+
+def __getattr__(name: str) -> Any:
+    """旧名称 EmbeddingCache 仍指向旧版缓存数据类，访问时给出弃用警告"""
+    if name == "EmbeddingCache":
+        warnings.warn(
+            "EmbeddingCache 已弃用，嵌入缓存已改为 SQLiteEmbeddingCache",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        return _LegacyEmbeddingCache
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
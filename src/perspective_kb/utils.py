@@ -2,12 +2,14 @@
 工具函数模块
 """
 import logging
+import os
 import time
 import functools
 from pathlib import Path
 from typing import Any, Callable, Optional, TypeVar
 from functools import wraps
 
+import numpy as np
 import structlog
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
@@ -21,45 +23,57 @@ T = TypeVar('T')
 # 全局控制台实例
 console = Console()
 
+# 配置structlog（进程内只配置一次）
+structlog.configure(
+    processors=[
+        structlog.stdlib.filter_by_level,
+        structlog.stdlib.add_logger_name,
+        structlog.stdlib.add_log_level,
+        structlog.stdlib.PositionalArgumentsFormatter(),
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.StackInfoRenderer(),
+        structlog.processors.format_exc_info,
+        structlog.processors.UnicodeDecoder(),
+        structlog.processors.JSONRenderer()
+    ],
+    wrapper_class=structlog.stdlib.BoundLogger,
+    logger_factory=structlog.stdlib.LoggerFactory(),
+    cache_logger_on_first_use=True,
+)
+
 
 def timer(func: Callable[..., T]) -> Callable[..., T]:
-    """函数执行时间装饰器"""
+    """
+    函数执行时间装饰器
+    
+    设置环境变量 PKB_TIMING=0 时直接返回原函数，不产生任何计时开销。
+    """
+    if os.getenv("PKB_TIMING", "1") != "1":
+        return func
+    
+    logger = get_logger("timer")
+    
     @wraps(func)
     def wrapper(*args, **kwargs) -> T:
         start = time.perf_counter()
         result = func(*args, **kwargs)
-        end = time.perf_counter()
-        duration = end - start
-        
-        # 使用rich输出
-        console.print(f"⏱️  [green]Function[/green] [bold]{func.__name__}[/bold] "
-                     f"[yellow]executed in[/yellow] [bold]{duration:.4f}s[/bold]")
+        logger.debug("函数执行耗时", 
+                     function=func.__qualname__,
+                     duration=f"{time.perf_counter() - start:.4f}s")
         return result
     return wrapper
 
 
+@functools.lru_cache(maxsize=None)
 def get_logger(name: str = "perspective_kb", 
                level: str = "INFO",
                log_file: Optional[Path] = None) -> structlog.BoundLogger:
-    """获取结构化日志记录器"""
-    
-    # 配置structlog
-    structlog.configure(
-        processors=[
-            structlog.stdlib.filter_by_level,
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()
-        ],
-        wrapper_class=structlog.stdlib.BoundLogger,
-        logger_factory=structlog.stdlib.LoggerFactory(),
-        cache_logger_on_first_use=True,
-    )
+    """
+    获取结构化日志记录器
+    
+    同一组参数只创建一次，重复调用直接返回缓存的记录器，
+    也避免重复添加文件处理器。
+    """
     
     # 获取logger
     logger = structlog.get_logger(name)
@@ -168,6 +182,15 @@ def ensure_directory(path: Path) -> Path:
     return path
 
 
+def json_default(obj: Any) -> Any:
+    """json.dump的default钩子，在序列化边界把NumPy对象转换为Python原生类型"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 def format_file_size(size_bytes: int) -> str:
     """格式化文件大小"""
     for unit in ['B', 'KB', 'MB', 'GB']:
@@ -2,26 +2,267 @@
 现代化向量数据库模块 - 2025年版本
 支持Milvus Lite和Milvus服务器，优化性能和错误处理
 """
+import os
+import queue
+import threading
 import time
-from typing import List, Dict, Any, Optional, Tuple, Union
+from typing import List, Dict, Any, AsyncIterator, Callable, Iterator, Optional, Sequence, Set, Tuple, Union
 from pathlib import Path
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
+import numpy as np
+import orjson
+
 from pymilvus import (
+    AsyncMilvusClient,
     MilvusClient,
     DataType,
     FieldSchema,
+    MilvusException,
     CollectionSchema,
     connections,
     db,
     utility
 )
 
-from .config import settings, VectorDBType
+from .config import settings, VectorDBType, VectorDType
 from .utils import get_logger
 
+try:
+    # pymilvus按ndarray的dtype选择占位符类型，ml_dtypes.bfloat16对应BFLOAT16_VECTOR
+    from ml_dtypes import bfloat16 as _NP_BFLOAT16
+except ImportError:
+    _NP_BFLOAT16 = None
+
+__all__ = [
+    "VectorDBError",
+    "ConnectionError",
+    "CollectionError",
+    "SearchError",
+    "SearchResult",
+    "CollectionInfo",
+    "BaseVectorDB",
+    "LocalVectorDB",
+    "AsyncLocalVectorDB",
+    "ServerVectorDB",
+    "get_vector_db",
+    "create_local_db",
+    "create_async_local_db",
+    "create_server_db",
+    "reset_client_pool",
+]
+
+
+_VECTOR_FIELD_TYPES = {
+    VectorDType.FLOAT32: DataType.FLOAT_VECTOR,
+    VectorDType.BFLOAT16: DataType.BFLOAT16_VECTOR,
+}
+
+
+def _to_bfloat16_bytes(vector: np.ndarray) -> bytes:
+    """float32向量按就近舍入取高16位，打包为bfloat16字节"""
+    bits = np.ascontiguousarray(vector, dtype=np.float32).view(np.uint32)
+    rounded = (bits + 0x7FFF + ((bits >> 16) & 1)) >> 16
+    return rounded.astype(np.uint16).tobytes()
+
+
+# 自动调优时upsert批大小的上限，避免单次gRPC消息过大
+_UPSERT_BATCH_MAX = 4096
+# 批大小翻倍后吞吐至少提升10%才继续增大
+_UPSERT_TUNE_GAIN = 1.1
+
+# describe_index 返回的状态字段，重建索引时不作为索引参数
+_INDEX_DESCRIBE_KEYS = frozenset({
+    "field_name", "index_name", "index_type", "metric_type",
+    "total_rows", "indexed_rows", "pending_index_rows", "state",
+})
+
+
+def _meta_json(metadata: Union[Dict[str, Any], str]) -> str:
+    """
+    用orjson预先序列化元数据
+    
+    pymilvus对字符串形式的JSON字段只做一次C实现的校验解析，
+    跳过其逐节点转换NumPy类型的Python遍历。
+    """
+    if isinstance(metadata, str):
+        return metadata
+    return orjson.dumps(metadata, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _rows_from_columns(ids: Sequence[Any],
+                       vectors: np.ndarray,
+                       texts: Sequence[str],
+                       metas: Sequence[Union[Dict[str, Any], str]],
+                       normalize: bool = False) -> List[Dict[str, Any]]:
+    """将列数据组装为MilvusClient写入所需的行，normalize为True时先归一化为单位向量"""
+    if normalize:
+        vectors = _unit_rows(vectors)
+    return [
+        {
+            "id": str(id_),
+            "vector": _encode_vector(vector),
+            "text_for_embedding": text,
+            "metadata": _meta_json(meta)
+        }
+        for id_, vector, text, meta in zip(ids, vectors, texts, metas)
+    ]
+
+
+def _rows_from_entities(batch: List[Dict[str, Any]],
+                        buffer: Optional[np.ndarray] = None,
+                        normalize: bool = False) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """
+    将实体字典批次转换为写入行
+    
+    向量已是连续的float32数组（如DataHelper打包出的行视图）时直接使用；
+    否则拷入连续的float32缓冲区，传入的缓冲区足够大时直接复用。
+    
+    Returns:
+        Tuple[List[Dict], np.ndarray]: (写入行, 本次使用的缓冲区)
+    """
+    vectors = [item["vector"] for item in batch]
+    if not all(isinstance(vector, np.ndarray) 
+               and vector.dtype == np.float32 
+               and vector.flags.c_contiguous 
+               for vector in vectors):
+        dim = len(vectors[0])
+        if buffer is None or buffer.shape[0] < len(batch) or buffer.shape[1] != dim:
+            buffer = np.empty((len(batch), dim), dtype=np.float32)
+        packed = buffer[:len(batch)]
+        for row, vector in zip(packed, vectors):
+            row[:] = vector
+        vectors = packed
+    
+    rows = _rows_from_columns(
+        [item["id"] for item in batch],
+        vectors,
+        [item["text_for_embedding"] for item in batch],
+        [item["metadata"] for item in batch],
+        normalize
+    )
+    return rows, buffer
+
+
+def _unit_l2_enabled(index_type: str, metric_type: str) -> bool:
+    """
+    新建索引时是否以单位向量的L2距离代替COSINE/IP
+    
+    单位向量上L2与余弦排序等价，但L2聚类更均衡，相同召回所需的nprobe更小。
+    只在建索引时按配置决定；已有集合的模式从其索引读取，见 _metric_for_index。
+    """
+    return (settings.ivf_use_l2 
+            and index_type != "FLAT" 
+            and metric_type in ("COSINE", "IP"))
+
+
+# 以单位L2方式建索引的集合带有此属性；Milvus Lite不保留自定义的索引名，因此记在集合属性上
+_UNIT_L2_PROPERTY = "perspective_kb.unit_l2"
+
+
+def _dim_from_description(description: Dict[str, Any]) -> Optional[int]:
+    """从describe_collection的结果中取向量字段的维度，没有向量字段时返回None"""
+    for field in description.get("fields", []):
+        if field.get("name") == "vector":
+            return int(field["params"]["dim"])
+    return None
+
+
+def _index_from_description(index: Dict[str, Any], description: Dict[str, Any]) -> Dict[str, Any]:
+    """describe_index的结果加上集合属性中的单位L2标记"""
+    index = dict(index)
+    properties = description.get("properties") or {}
+    index["unit_l2"] = str(properties.get(_UNIT_L2_PROPERTY, "")).lower() == "true"
+    return index
+
+
+def _index_build_params(index_type: str, nlist: Optional[int] = None) -> Dict[str, Any]:
+    """各索引类型的建索引参数；IVF系列按nlist分桶，搜索时只探查nprobe个桶"""
+    nlist = nlist or settings.ivf_nlist
+    if index_type == "FLAT":
+        return {}
+    if index_type in ("IVF_FLAT", "IVF_SQ8"):
+        return {"nlist": nlist}
+    if index_type == "IVF_PQ":
+        return {"nlist": nlist, "m": settings.pq_m, "nbits": settings.pq_nbits}
+    if index_type == "HNSW":
+        return {"M": settings.hnsw_m, "efConstruction": settings.hnsw_ef_construction}
+    raise VectorDBError(f"不支持的索引类型: {index_type}")
+
+
+def _index_search_params(index_type: Optional[str], limit: int) -> Dict[str, Any]:
+    """各索引类型的默认搜索参数；集合尚无索引时按配置推断即将创建的索引类型"""
+    index_type = index_type or settings.get_index_type()
+    if index_type == "HNSW":
+        return {"params": {"ef": max(settings.hnsw_ef, limit)}}
+    if index_type.startswith("IVF_"):
+        return {"params": {"nprobe": settings.ivf_nprobe}}
+    # FLAT为暴力检索，没有搜索参数
+    return {"params": {}}
+
+
+def _exact_distances(metric: str, query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """按原始向量计算与Milvus同口径的距离，用于量化索引的结果重排"""
+    if metric in ("L2", "UNIT_L2"):
+        diff = candidates - query
+        return np.einsum("ij,ij->i", diff, diff)
+    if metric == "COSINE":
+        norms = np.linalg.norm(candidates, axis=1) * np.linalg.norm(query)
+        return candidates @ query / np.where(norms > 0, norms, 1.0)
+    return candidates @ query
+
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    """按行归一化为单位向量，零向量保持不变"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+# 向量字段已有索引时create_index返回的错误码：Milvus Lite为35，Milvus服务器为702（index duplicates）
+_INDEX_EXISTS_CODES = frozenset({35, 702})
+
+
+# Milvus距离到0-1相似度分数的换算，按度量方式取用，整批向量化计算；
+# 传入的距离数组由每次搜索新建，就地换算，不再分配中间数组
+_SCORE_FUNCTIONS = {
+    # 单位向量的L2距离平方 d = 2 - 2cos，换算后与COSINE的分数一致
+    "UNIT_L2": lambda distances: np.add(np.multiply(distances, -0.25, out=distances), 1.0, out=distances),
+    # COSINE: distance范围是[-1, 1], 转换为[0, 1]
+    "COSINE": lambda distances: np.multiply(np.add(distances, 1.0, out=distances), 0.5, out=distances),
+    # L2: distance越小越相似，转换为相似度分数
+    "L2": lambda distances: np.reciprocal(np.add(distances, 1.0, out=distances), out=distances),
+}
+
+
+def _clip_scores(distances: np.ndarray) -> np.ndarray:
+    """其他度量方式（如IP）：直接截断到[0, 1]"""
+    return np.clip(distances, 0.0, 1.0, out=distances)
+
+
+def _encode_vector(vector: np.ndarray) -> Union[np.ndarray, bytes]:
+    """按配置的存储精度编码写入的向量；写入时pymilvus按集合schema解释bytes"""
+    if settings.vector_dtype == VectorDType.BFLOAT16:
+        return _to_bfloat16_bytes(vector)
+    return vector
+
+
+def _encode_query(vector: np.ndarray) -> np.ndarray:
+    """
+    编码查询向量，始终返回ndarray
+    
+    查询不能用bytes：pymilvus拿不到集合schema时（2.6版本，或3.x调用未传schema）
+    会把bytes当作BINARY_VECTOR占位符。bfloat16集合在安装了ml_dtypes时发送bfloat16数组，
+    否则发送float32数组。
+    """
+    vector = np.asarray(vector, dtype=np.float32)
+    if settings.vector_dtype == VectorDType.BFLOAT16 and _NP_BFLOAT16 is not None:
+        return vector.astype(_NP_BFLOAT16)
+    return vector
+
 
 class VectorDBError(Exception):
     """向量数据库操作异常"""
@@ -43,22 +284,26 @@ class SearchError(VectorDBError):
     pass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SearchResult:
-    """搜索结果数据类"""
+    """搜索结果数据类（无实例__dict__，每次命中只分配一个紧凑对象）"""
     id: str
     score: float
     metadata: Dict[str, Any]
     distance: float
+    text: Optional[str] = None  # 仅在output_fields包含text_for_embedding时返回
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
-        return {
+        result = {
             "id": self.id,
             "score": self.score,
             "metadata": self.metadata,
             "distance": self.distance
         }
+        if self.text is not None:
+            result["text"] = self.text
+        return result
 
 
 @dataclass
@@ -71,6 +316,117 @@ class CollectionInfo:
     index_info: Optional[Dict[str, Any]] = None
 
 
+class _ClientPool:
+    """
+    进程级MilvusClient连接池
+    
+    按连接参数分组复用客户端：借出时优先取空闲连接，总数达到上限时阻塞等待归还，
+    超时抛出ConnectionError；归还时空闲连接超过上限则直接关闭。
+    
+    向量库实例在connect时借出一个客户端，持有到close()才归还，而不是每次调用都
+    ``with pool.client()`` 借还：实例上缓存的集合状态（已知集合、已加载、索引、维度）
+    跟随这条连接，单次调用也不必再竞争池锁。因此max_total限制的是同时连接的实例数，
+    超出的实例在connect时等待；短时借用仍可使用 ``client()``。
+    """
+    
+    def __init__(self, 
+                 max_total: Optional[int] = None, 
+                 max_idle: Optional[int] = None, 
+                 max_block_wait: Optional[float] = None):
+        self.max_total = settings.milvus_pool_max_total if max_total is None else max_total
+        self.max_idle = settings.milvus_pool_max_idle if max_idle is None else max_idle
+        self.max_block_wait = settings.milvus_pool_max_wait if max_block_wait is None else max_block_wait
+        self._condition = threading.Condition()
+        self._idle: Dict[Tuple, "queue.LifoQueue[MilvusClient]"] = {}
+        self._total: Dict[Tuple, int] = {}
+    
+    def get_client(self, key: Tuple, factory: Callable[[], MilvusClient]) -> MilvusClient:
+        """借出一个客户端，没有空闲连接且未达上限时用factory新建"""
+        deadline = time.monotonic() + self.max_block_wait
+        with self._condition:
+            idle = self._idle.setdefault(key, queue.LifoQueue())
+            while idle.empty() and self._total.get(key, 0) >= self.max_total:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise ConnectionError(f"等待Milvus连接超时（上限 {self.max_total}）")
+            if not idle.empty():
+                return idle.get_nowait()
+            self._total[key] = self._total.get(key, 0) + 1
+        
+        # 建立连接较慢，不持有锁
+        try:
+            return factory()
+        except Exception:
+            self.discard(key, None)
+            raise
+    
+    def return_client(self, key: Tuple, client: MilvusClient) -> None:
+        """归还客户端，空闲连接已满时关闭"""
+        with self._condition:
+            idle = self._idle.setdefault(key, queue.LifoQueue())
+            if idle.qsize() < self.max_idle:
+                idle.put_nowait(client)
+                self._condition.notify()
+                return
+        self.discard(key, client)
+    
+    def discard(self, key: Tuple, client: Optional[MilvusClient]) -> None:
+        """丢弃失效的客户端并释放名额"""
+        with self._condition:
+            self._total[key] = max(self._total.get(key, 0) - 1, 0)
+            self._condition.notify()
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+    
+    @contextmanager
+    def client(self, key: Tuple, factory: Callable[[], MilvusClient]):
+        """借出客户端的上下文管理器，退出时自动归还"""
+        client = self.get_client(key, factory)
+        try:
+            yield client
+        finally:
+            self.return_client(key, client)
+    
+    def clear(self) -> None:
+        """关闭所有空闲连接并清空计数（主要用于测试）"""
+        with self._condition:
+            idle_queues = list(self._idle.values())
+            self._idle.clear()
+            self._total.clear()
+            self._condition.notify_all()
+        for idle in idle_queues:
+            while not idle.empty():
+                try:
+                    idle.get_nowait().close()
+                except Exception:
+                    pass
+
+
+_client_pool: Optional[_ClientPool] = None
+_client_pool_lock = threading.Lock()
+
+
+def _get_client_pool() -> _ClientPool:
+    """获取进程级连接池，首次使用时创建"""
+    global _client_pool
+    with _client_pool_lock:
+        if _client_pool is None:
+            _client_pool = _ClientPool()
+        return _client_pool
+
+
+def reset_client_pool() -> None:
+    """关闭并丢弃进程级连接池，下次连接时按当前配置重建"""
+    global _client_pool
+    with _client_pool_lock:
+        pool, _client_pool = _client_pool, None
+    if pool is not None:
+        pool.clear()
+
+
 class BaseVectorDB:
     """向量数据库基类"""
     
@@ -78,6 +434,20 @@ class BaseVectorDB:
         self.logger = get_logger(self.__class__.__name__)
         self.client: Optional[MilvusClient] = None
         self._connection_pool = None
+        # 批量导入期间被临时删除的索引描述，按集合名记录
+        self._bulk_indexes: Dict[str, List[Dict[str, Any]]] = {}
+        # 已知存在的集合名，首次使用时从服务端加载
+        self._known: Optional[Set[str]] = None
+        # 已加载到内存的集合名，搜索时据此跳过load_collection
+        self._loaded: Set[str] = set()
+        # 从连接池借出的客户端对应的连接参数
+        self._pool_key: Optional[Tuple] = None
+        # 集合名到向量索引描述（describe_index结果），搜索时据此选择搜索参数和分数换算
+        self._index_info: Dict[str, Dict[str, Any]] = {}
+        # 已确认建有向量索引的集合名，_ensure_index_exists据此跳过请求
+        self._indexed: Set[str] = set()
+        # 集合名到向量维度，写入前在本地校验
+        self._vector_dims: Dict[str, int] = {}
         
     def __enter__(self):
         """上下文管理器入口"""
@@ -106,14 +476,36 @@ class BaseVectorDB:
         return await asyncio.get_event_loop().run_in_executor(None, self.connect)
     
     def close(self) -> None:
-        """关闭连接（同步）"""
+        """关闭连接（同步），从连接池借出的客户端归还到池中"""
         try:
             if self.client:
-                self.client.close()
+                if self._pool_key is not None:
+                    _get_client_pool().return_client(self._pool_key, self.client)
+                else:
+                    self.client.close()
+                self.client = None
+                self._pool_key = None
                 self.logger.info("数据库连接已关闭")
         except Exception as e:
             self.logger.warning("关闭数据库连接时出错", error=str(e))
     
+    def _acquire_client(self, **connect_params) -> None:
+        """从进程级连接池借出客户端，并重置本实例的集合状态缓存"""
+        if self.client:
+            self.close()
+        key = tuple(sorted(connect_params.items()))
+        self.client = _get_client_pool().get_client(key, lambda: MilvusClient(**connect_params))
+        self._pool_key = key
+        self._known = None
+        self._loaded.clear()
+    
+    def _discard_client(self) -> None:
+        """丢弃连接失败的客户端"""
+        if self.client is not None and self._pool_key is not None:
+            _get_client_pool().discard(self._pool_key, self.client)
+        self.client = None
+        self._pool_key = None
+    
     async def close_async(self) -> None:
         """关闭连接（异步）"""
         await asyncio.get_event_loop().run_in_executor(None, self.close)
@@ -141,27 +533,318 @@ class BaseVectorDB:
     def upsert(self, 
                entities: List[Dict[str, Any]], 
                collection_name: str,
-               batch_size: Optional[int] = None) -> bool:
+               batch_size: Optional[int] = None,
+               flush: bool = False) -> bool:
         """插入或更新数据"""
         raise NotImplementedError
     
+    def upsert_columns(self, 
+                       collection_name: str,
+                       ids: Sequence[Any],
+                       vectors: np.ndarray,
+                       texts: Sequence[str],
+                       metas: Sequence[Dict[str, Any]],
+                       batch_size: Optional[int] = None,
+                       flush: bool = False) -> bool:
+        """按列插入或更新数据"""
+        raise NotImplementedError
+    
+    async def upsert_async(self, 
+                           entities: List[Dict[str, Any]], 
+                           collection_name: str,
+                           batch_size: Optional[int] = None,
+                           flush: bool = False) -> bool:
+        """并发插入或更新数据（异步）"""
+        raise NotImplementedError
+    
+    def finalize_bulk(self, collection_name: str) -> None:
+        """
+        结束批量导入：刷盘并加载集合
+        
+        upsert 默认不刷盘，多次写入后调用一次即可。
+        """
+        try:
+            start_time = time.time()
+            self.client.flush(collection_name)
+            self.client.load_collection(collection_name)
+            self._loaded.add(collection_name)
+            self.logger.info("批量导入完成", 
+                           collection_name=collection_name,
+                           finalize_time=f"{time.time() - start_time:.3f}s")
+        except Exception as e:
+            self.logger.error("批量导入收尾失败", 
+                            collection_name=collection_name,
+                            error=str(e))
+            raise VectorDBError(f"刷新集合 {collection_name} 失败: {e}")
+    
+    def begin_bulk_load(self, collection_name: str) -> None:
+        """
+        开始批量导入：释放集合并删除其向量索引
+        
+        导入期间不再逐批维护索引，由 end_bulk_load 一次性重建。
+        """
+        try:
+            indexes = [
+                self.client.describe_index(collection_name, index_name)
+                for index_name in self.client.list_indexes(collection_name)
+            ]
+            self.client.release_collection(collection_name)
+            self._loaded.discard(collection_name)
+            self._indexed.discard(collection_name)
+            for index in indexes:
+                self.client.drop_index(collection_name, index["index_name"])
+            self._bulk_indexes[collection_name] = indexes
+            self.logger.info("批量导入开始，已删除索引", 
+                           collection_name=collection_name,
+                           index_count=len(indexes))
+        except Exception as e:
+            self.logger.error("批量导入准备失败", 
+                            collection_name=collection_name,
+                            error=str(e))
+            raise VectorDBError(f"删除集合 {collection_name} 的索引失败: {e}")
+    
+    def end_bulk_load(self, collection_name: str) -> None:
+        """结束批量导入：刷盘、按原参数重建索引并加载集合"""
+        indexes = self._bulk_indexes.pop(collection_name, [])
+        try:
+            start_time = time.time()
+            self.client.flush(collection_name)
+            if indexes:
+                index_params = MilvusClient.prepare_index_params()
+                for index in indexes:
+                    params = {k: v for k, v in index.items() if k not in _INDEX_DESCRIBE_KEYS}
+                    index_params.add_index(
+                        field_name=index["field_name"],
+                        index_type=index["index_type"],
+                        index_name=index["index_name"],
+                        metric_type=index["metric_type"],
+                        params=params
+                    )
+                self.client.create_index(collection_name=collection_name, index_params=index_params)
+                self._indexed.add(collection_name)
+            self.client.load_collection(collection_name)
+            self._loaded.add(collection_name)
+            self.logger.info("批量导入完成，索引已重建", 
+                           collection_name=collection_name,
+                           index_count=len(indexes),
+                           finalize_time=f"{time.time() - start_time:.3f}s")
+        except Exception as e:
+            self.logger.error("重建索引失败", 
+                            collection_name=collection_name,
+                            error=str(e))
+            raise VectorDBError(f"重建集合 {collection_name} 的索引失败: {e}")
+    
+    @contextmanager
+    def bulk_load(self, collection_name: str):
+        """
+        批量导入上下文：进入时删除索引，退出时（包括异常退出）重建索引
+        
+        导入本身出错时仍会重建索引，并重新抛出导入的异常；
+        此时重建失败只记录日志并附在该异常的注释里，不会掩盖导入错误。
+        
+        Example:
+            with db.bulk_load("knowledge"):
+                db.upsert(entities, "knowledge")
+        """
+        self.begin_bulk_load(collection_name)
+        try:
+            yield self
+        except BaseException as ingest_error:
+            try:
+                self.end_bulk_load(collection_name)
+            except VectorDBError as rebuild_error:
+                self.logger.error("批量导入失败，且索引重建失败", 
+                                collection_name=collection_name,
+                                ingest_error=repr(ingest_error),
+                                rebuild_error=str(rebuild_error))
+                ingest_error.add_note(f"重建集合 {collection_name} 的索引也失败了: {rebuild_error}")
+            raise
+        self.end_bulk_load(collection_name)
+    
     def search(self, 
                collection_name: str, 
-               query_vectors: List[List[float]],
+               query_vectors: Sequence[np.ndarray],
                top_k: Optional[int] = None,
                search_params: Optional[Dict[str, Any]] = None,
-               filter_expr: Optional[str] = None) -> List[List[SearchResult]]:
+               filter_expr: Optional[str] = None,
+               output_fields: Optional[List[str]] = None) -> List[List[SearchResult]]:
         """向量搜索"""
         raise NotImplementedError
     
+    def search_many(self, 
+                    collection_name: str, 
+                    vectors: np.ndarray,
+                    top_k: Optional[int] = None,
+                    filter_expr: Optional[str] = None,
+                    output_fields: Optional[List[str]] = None) -> Iterator[List[SearchResult]]:
+        """
+        一次请求搜索多个查询向量，按查询顺序逐个产出结果
+        
+        服务端每次请求的固定开销由整批查询分摊，调用方不应逐条调用 search。
+        
+        Args:
+            collection_name: 集合名称
+            vectors: (N, D) 查询向量矩阵，单个向量也可直接传入
+            top_k: 每个查询返回的结果数量
+            filter_expr: 过滤表达式
+            output_fields: 返回的标量字段，默认只取metadata
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[np.newaxis, :]
+        yield from self.search(collection_name, vectors, top_k=top_k, 
+                               filter_expr=filter_expr, output_fields=output_fields)
+    
+    async def search_stream(self, 
+                            collection_name: str, 
+                            vectors: np.ndarray,
+                            top_k: Optional[int] = None,
+                            batch_size: Optional[int] = None,
+                            filter_expr: Optional[str] = None,
+                            output_fields: Optional[List[str]] = None) -> AsyncIterator[List[SearchResult]]:
+        """
+        分批异步搜索，逐个产出每个查询的结果
+        
+        下一批的搜索请求在产出当前批结果之前已经发出，调用方处理结果与网络往返重叠。
+        
+        Args:
+            collection_name: 集合名称
+            vectors: (N, D) 查询向量矩阵
+            top_k: 每个查询返回的结果数量
+            batch_size: 每次请求携带的查询数量
+            filter_expr: 过滤表达式
+            output_fields: 返回的标量字段，默认只取metadata
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[np.newaxis, :]
+        batch_size = batch_size or settings.batch_size
+        loop = asyncio.get_running_loop()
+        
+        def run(chunk: np.ndarray) -> List[List[SearchResult]]:
+            return self.search(collection_name, chunk, top_k=top_k, 
+                               filter_expr=filter_expr, output_fields=output_fields)
+        
+        pending = None
+        for start in range(0, len(vectors), batch_size):
+            future = loop.run_in_executor(None, run, vectors[start:start + batch_size])
+            if pending is not None:
+                for result in await pending:
+                    yield result
+            pending = future
+        
+        if pending is not None:
+            for result in await pending:
+                yield result
+    
     def get_collection_info(self, collection_name: str) -> CollectionInfo:
         """获取集合信息"""
         raise NotImplementedError
     
+    def _vector_dim(self, collection_name: str) -> Optional[int]:
+        """获取集合向量字段的维度，按集合缓存；集合不存在时返回None"""
+        if collection_name not in self._vector_dims:
+            try:
+                description = self.client.describe_collection(collection_name)
+            except MilvusException:
+                return None
+            dim = _dim_from_description(description)
+            if dim is None:
+                return None
+            self._vector_dims[collection_name] = dim
+        return self._vector_dims[collection_name]
+    
+    def _check_dims(self, collection_name: str, dims: np.ndarray) -> None:
+        """写入前校验每条向量的维度，避免一次RPC往返后才由服务端报错"""
+        self._verify_dims(collection_name, dims, self._vector_dim(collection_name))
+    
+    @staticmethod
+    def _verify_dims(collection_name: str, dims: np.ndarray, expected: Optional[int]) -> None:
+        """
+        按已知的集合维度校验每条向量的维度，集合维度未知时不校验
+        
+        Raises:
+            VectorDBError: 维度与集合不一致，指出第一条不匹配的位置
+        """
+        if expected is None:
+            return
+        mismatched = np.flatnonzero(dims != expected)
+        if mismatched.size:
+            index = int(mismatched[0])
+            raise VectorDBError(
+                f"向量维度不匹配: 第 {index} 条为 {int(dims[index])} 维，"
+                f"集合 {collection_name} 为 {expected} 维（共 {mismatched.size} 条不匹配）"
+            )
+    
+    @staticmethod
+    def _entity_dims(entities: List[Dict[str, Any]]) -> np.ndarray:
+        """实体列表中每条向量的维度"""
+        return np.fromiter((len(item["vector"]) for item in entities), dtype=np.int64, count=len(entities))
+    
+    def _check_entity_dims(self, entities: List[Dict[str, Any]], collection_name: str) -> None:
+        """校验实体列表中每条向量的维度"""
+        self._check_dims(collection_name, self._entity_dims(entities))
+    
+    def _vector_index(self, collection_name: str) -> Optional[Dict[str, Any]]:
+        """获取集合向量索引的描述，按集合缓存；没有索引或查询失败时返回None且不缓存"""
+        if collection_name not in self._index_info:
+            try:
+                names = self.client.list_indexes(collection_name, field_name="vector")
+                if not names:
+                    return None
+                self._index_info[collection_name] = _index_from_description(
+                    self.client.describe_index(collection_name, names[0]),
+                    self.client.describe_collection(collection_name)
+                )
+            except Exception:
+                return None
+        return self._index_info[collection_name]
+    
+    def _metric_of(self, collection_name: str) -> str:
+        """集合实际使用的度量方式，见 _metric_for_index"""
+        return self._metric_for_index(self._vector_index(collection_name))
+    
+    @staticmethod
+    def _metric_for_index(index: Optional[Dict[str, Any]]) -> str:
+        """
+        集合实际使用的度量方式，决定查询是否归一化以及距离到分数的换算
+        
+        取自集合向量索引的metric_type，以集合属性区分UNIT_L2与普通L2；
+        与当前配置无关，配置改变后已有集合仍按建索引时的方式计算。
+        集合尚无索引时按配置推断即将创建的索引。
+        """
+        if not index or not index.get("metric_type"):
+            index_type = settings.get_index_type()
+            if _unit_l2_enabled(index_type, settings.similarity_metric):
+                return "UNIT_L2"
+            return settings.similarity_metric
+        if index["metric_type"] == "L2" and index.get("unit_l2"):
+            return "UNIT_L2"
+        return index["metric_type"]
+    
+    def _has(self, collection_name: str) -> bool:
+        """
+        判断集合是否存在，优先使用本地缓存的集合名
+        
+        缓存未命中时再向服务端确认一次，以发现其他进程新建的集合。
+        """
+        if self._known is None:
+            self._known = set(self.client.list_collections())
+        if collection_name in self._known:
+            return True
+        if self.client.has_collection(collection_name):
+            self._known.add(collection_name)
+            return True
+        return False
+    
     def list_collections(self) -> List[str]:
         """列出所有集合"""
         try:
-            return self.client.list_collections() if self.client else []
+            if not self.client:
+                return []
+            collections = self.client.list_collections()
+            self._known = set(collections)
+            return collections
         except Exception as e:
             self.logger.error("列出集合失败", error=str(e))
             return []
@@ -169,8 +852,13 @@ class BaseVectorDB:
     def drop_collection(self, collection_name: str) -> bool:
         """删除集合"""
         try:
-            if self.client and self.client.has_collection(collection_name):
+            if self.client and self._has(collection_name):
                 self.client.drop_collection(collection_name)
+                self._known.discard(collection_name)
+                self._loaded.discard(collection_name)
+                self._indexed.discard(collection_name)
+                self._index_info.pop(collection_name, None)
+                self._vector_dims.pop(collection_name, None)
                 self.logger.info("集合删除成功", collection_name=collection_name)
                 return True
             else:
@@ -186,6 +874,9 @@ class BaseVectorDB:
 class LocalVectorDB(BaseVectorDB):
     """本地向量数据库管理器（Milvus Lite）"""
     
+    # Milvus Lite尚未实现的索引类型
+    _UNSUPPORTED_INDEX_TYPES = frozenset({"IVF_PQ"})
+    
     def __init__(self, db_path: Optional[str] = None):
         """
         初始化本地向量数据库
@@ -204,7 +895,7 @@ class LocalVectorDB(BaseVectorDB):
             db_dir = Path(self.db_path).parent
             db_dir.mkdir(parents=True, exist_ok=True)
             
-            self.client = MilvusClient(uri=self.db_path)
+            self._acquire_client(uri=self.db_path)
             self.logger.info("本地向量数据库连接成功", db_path=self.db_path)
             return True
         except Exception as e:
@@ -229,14 +920,22 @@ class LocalVectorDB(BaseVectorDB):
         """
         vector_dim = vector_dim or settings.vector_dim
         metric_type = metric_type or settings.similarity_metric
-        index_type = index_type or ("FLAT" if settings.use_flat_index else "IVF_FLAT")
+        index_type = index_type or settings.get_index_type()
+        unit_l2 = _unit_l2_enabled(index_type, metric_type)
+        if unit_l2:
+            metric_type = "L2"
         
         try:
             # 检查集合是否已存在
-            if self.client.has_collection(collection_name):
+            if self._has(collection_name):
                 if force_recreate:
                     self.logger.info("删除现有集合", collection_name=collection_name)
                     self.client.drop_collection(collection_name)
+                    self._known.discard(collection_name)
+                    self._loaded.discard(collection_name)
+                    self._indexed.discard(collection_name)
+                    self._index_info.pop(collection_name, None)
+                    self._vector_dims.pop(collection_name, None)
                 else:
                     self.logger.info("集合已存在", collection_name=collection_name)
                     return True
@@ -253,7 +952,7 @@ class LocalVectorDB(BaseVectorDB):
                 ),
                 FieldSchema(
                     name="vector", 
-                    dtype=DataType.FLOAT_VECTOR, 
+                    dtype=_VECTOR_FIELD_TYPES[settings.vector_dtype], 
                     dim=vector_dim,
                     description="向量数据"
                 ),
@@ -276,15 +975,18 @@ class LocalVectorDB(BaseVectorDB):
                 schema=schema,
                 properties={"collection.ttl.seconds": 0}  # 不自动删除
             )
+            self._known.add(collection_name)
+            self._vector_dims[collection_name] = vector_dim
             
             # 在集合创建后立即建立索引
-            self._create_index_immediately(collection_name, metric_type)
+            self._create_index_immediately(collection_name, metric_type, index_type, unit_l2=unit_l2)
             
             self.logger.info("集合创建成功", 
                            collection_name=collection_name,
                            vector_dim=vector_dim,
                            metric_type=metric_type,
-                           index_type=index_type)
+                           index_type=index_type,
+                           vector_dtype=settings.vector_dtype.value)
             
             return True
             
@@ -297,64 +999,74 @@ class LocalVectorDB(BaseVectorDB):
     def upsert(self, 
                entities: List[Dict[str, Any]], 
                collection_name: str,
-               batch_size: Optional[int] = None) -> bool:
+               batch_size: Optional[int] = None,
+               flush: bool = False) -> bool:
         """
         批量插入或更新数据
         
         Args:
             entities: 实体数据列表
             collection_name: 集合名称
+            batch_size: 批处理大小（开启自动调优时为初始批大小）
+            flush: 是否在写入后刷盘并加载集合；默认不刷盘，批量导入结束时调用finalize_bulk或使用bulk_load
+        """
+        return self._write(entities, collection_name, batch_size, flush, prepare=True)
+    
+    def upsert_columns(self, 
+                       collection_name: str,
+                       ids: Sequence[Any],
+                       vectors: np.ndarray,
+                       texts: Sequence[str],
+                       metas: Sequence[Dict[str, Any]],
+                       batch_size: Optional[int] = None,
+                       flush: bool = False) -> bool:
+        """
+        按列批量插入数据
+        
+        向量以一个 (N, D) float32 矩阵传入，各行直接取矩阵行视图，
+        省去 upsert 中逐条复制实体字典的开销。MilvusClient 只接受行格式，
+        列在这里一次性组装为最终写入的行。已是C连续的float32矩阵时不做任何转换，
+        调用方宜预先堆叠：``np.vstack(embeddings).astype(np.float32, copy=False)``。
+        
+        Args:
+            collection_name: 集合名称
+            ids: 主键列
+            vectors: (N, D) 向量矩阵
+            texts: 嵌入文本列
+            metas: 元数据列
             batch_size: 批处理大小
+            flush: 是否在写入后刷盘并加载集合
         """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or not (len(ids) == len(vectors) == len(texts) == len(metas)):
+            raise VectorDBError(
+                f"列长度不一致: ids={len(ids)}, vectors={vectors.shape}, "
+                f"texts={len(texts)}, metas={len(metas)}"
+            )
+        self._check_dims(collection_name, np.full(len(vectors), vectors.shape[1]))
+        
+        rows = _rows_from_columns(ids, vectors, texts, metas, self._metric_of(collection_name) == "UNIT_L2")
+        return self._write(rows, collection_name, batch_size, flush, prepare=False)
+    
+    def _write(self, 
+               entities: List[Dict[str, Any]], 
+               collection_name: str,
+               batch_size: Optional[int],
+               flush: bool,
+               prepare: bool) -> bool:
+        """upsert 和 upsert_columns 的公共写入流程"""
         batch_size = batch_size or settings.batch_size
         
         try:
             if not entities:
                 self.logger.warning("没有数据需要插入")
                 return True
+            if prepare:
+                self._check_entity_dims(entities, collection_name)
             
-            total_batches = (len(entities) + batch_size - 1) // batch_size
-            successful_inserts = 0
-            
-            # 分批处理
-            for i in range(0, len(entities), batch_size):
-                batch = entities[i:i + batch_size]
-                batch_num = i // batch_size + 1
-                
-                try:
-                    # 准备数据
-                    insert_data = []
-                    for item in batch:
-                        insert_data.append({
-                            "id": str(item["id"]),
-                            "vector": item["vector"],
-                            "text_for_embedding": item["text_for_embedding"],
-                            "metadata": item["metadata"]
-                        })
-                    
-                    # 插入数据
-                    start_time = time.time()
-                    res = self.client.insert(collection_name, insert_data)
-                    insert_time = time.time() - start_time
-                    
-                    insert_count = res.get('insert_count', len(batch))
-                    successful_inserts += insert_count
-                    
-                    self.logger.debug("批次数据插入成功", 
-                                    collection_name=collection_name,
-                                    batch_size=len(batch),
-                                    batch_num=batch_num,
-                                    total_batches=total_batches,
-                                    insert_count=insert_count,
-                                    insert_time=f"{insert_time:.3f}s")
-                    
-                except Exception as batch_error:
-                    self.logger.error("批次数据插入失败", 
-                                    collection_name=collection_name,
-                                    batch_num=batch_num,
-                                    error=str(batch_error))
-                    # 继续处理下一批次
-                    continue
+            successful_inserts, total_batches = self._stream_upsert(
+                entities, collection_name, batch_size, prepare
+            )
             
             self.logger.info("数据插入完成", 
                            collection_name=collection_name,
@@ -362,6 +1074,9 @@ class LocalVectorDB(BaseVectorDB):
                            successful_inserts=successful_inserts,
                            total_batches=total_batches)
             
+            if flush and successful_inserts > 0:
+                self.finalize_bulk(collection_name)
+            
             return successful_inserts > 0
             
         except Exception as e:
@@ -370,76 +1085,282 @@ class LocalVectorDB(BaseVectorDB):
                             error=str(e))
             raise VectorDBError(f"插入数据到集合 {collection_name} 失败: {e}")
     
-    def _create_index_immediately(self, collection_name: str, metric_type: str = "COSINE") -> None:
-        """在集合创建后立即建立索引"""
-        try:
-            from pymilvus import MilvusClient
+    def _stream_upsert(self, 
+                       entities: List[Dict[str, Any]], 
+                       collection_name: str,
+                       batch_size: int,
+                       prepare: bool = True) -> Tuple[int, int]:
+        """
+        分批流式写入，prepare为False时实体已是最终写入的行格式
+        
+        开启 upsert_auto_tune 时按实测吞吐调整批大小：吞吐仍有明显提升就翻倍，
+        提升不足则固定在当前批大小，直到写完。
+        
+        Returns:
+            Tuple[int, int]: (成功写入条数, 批次数)
+        """
+        auto_tune = settings.upsert_auto_tune
+        normalize = prepare and self._metric_of(collection_name) == "UNIT_L2"
+        best_throughput = 0.0
+        # 各批次复用的连续float32向量缓冲区
+        buffer: Optional[np.ndarray] = None
+        successful_inserts = 0
+        batch_num = 0
+        position = 0
+        
+        while position < len(entities):
+            batch = entities[position:position + batch_size]
+            position += len(batch)
+            batch_num += 1
             
-            # 使用官方推荐的索引参数准备方法
-            index_params = MilvusClient.prepare_index_params()
+            try:
+                # 准备数据：整批向量拷入缓冲区，再按列组装为写入行
+                if prepare:
+                    insert_data, buffer = _rows_from_entities(batch, buffer, normalize)
+                else:
+                    insert_data = batch
+                
+                # 写入数据，主键已存在时覆盖
+                start_time = time.perf_counter()
+                res = self.client.upsert(collection_name, insert_data)
+                insert_time = time.perf_counter() - start_time
+                
+                insert_count = res.get('upsert_count', len(batch))
+                successful_inserts += insert_count
+                
+                self.logger.debug("批次数据插入成功", 
+                                collection_name=collection_name,
+                                batch_size=len(batch),
+                                batch_num=batch_num,
+                                insert_count=insert_count,
+                                insert_time=f"{insert_time:.3f}s")
+                
+                if auto_tune and len(batch) == batch_size:
+                    throughput = len(batch) / max(insert_time, 1e-6)
+                    if throughput > best_throughput * _UPSERT_TUNE_GAIN and batch_size < _UPSERT_BATCH_MAX:
+                        best_throughput = throughput
+                        batch_size = min(batch_size * 2, _UPSERT_BATCH_MAX)
+                    else:
+                        auto_tune = False
+                        self.logger.debug("写入批大小已稳定", 
+                                        collection_name=collection_name,
+                                        batch_size=batch_size)
+                
+            except Exception as batch_error:
+                self.logger.error("批次数据插入失败", 
+                                collection_name=collection_name,
+                                batch_num=batch_num,
+                                error=str(batch_error))
+                # 继续处理下一批次
+                continue
+        
+        return successful_inserts, batch_num
+    
+    async def upsert_async(self, 
+                           entities: List[Dict[str, Any]], 
+                           collection_name: str,
+                           batch_size: Optional[int] = None,
+                           flush: bool = False) -> bool:
+        """
+        并发批量插入或更新数据
+        
+        各批次在线程池中同时写入；瓶颈在gRPC往返而非CPU，pymilvus在等待网络时释放GIL。
+        
+        Args:
+            entities: 实体数据列表
+            collection_name: 集合名称
+            batch_size: 批处理大小
+            flush: 是否在写入后刷盘并加载集合
+        """
+        batch_size = batch_size or settings.batch_size
+        
+        try:
+            if not entities:
+                self.logger.warning("没有数据需要插入")
+                return True
+            self._check_entity_dims(entities, collection_name)
             
-            index_params.add_index(
-                field_name="vector",  # 向量字段名称
-                index_type="FLAT",   # 对于小数据集使用FLAT索引
-                index_name="vector_index",  # 索引名称
-                metric_type=metric_type,  # 相似度度量
-                params={}  # FLAT索引不需要额外参数
-            )
+            batches = [entities[i:i + batch_size] for i in range(0, len(entities), batch_size)]
+            normalize = self._metric_of(collection_name) == "UNIT_L2"
+            loop = asyncio.get_running_loop()
+            max_workers = min(8, os.cpu_count() or 1, len(batches))
             
-            self.client.create_index(
-                collection_name=collection_name,
-                index_params=index_params
-            )
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                counts = await asyncio.gather(*(
+                    loop.run_in_executor(pool, self._insert_one_batch, batch, collection_name, batch_num, normalize)
+                    for batch_num, batch in enumerate(batches, 1)
+                ))
+            successful_inserts = sum(counts)
             
-            self.logger.info("索引创建成功", 
+            self.logger.info("数据并发插入完成", 
                            collection_name=collection_name,
-                           index_type="FLAT",
-                           metric_type=metric_type)
+                           total_entities=len(entities),
+                           successful_inserts=successful_inserts,
+                           total_batches=len(batches),
+                           max_workers=max_workers)
+            
+            if flush and successful_inserts > 0:
+                await loop.run_in_executor(None, self.finalize_bulk, collection_name)
+            
+            return successful_inserts > 0
             
         except Exception as e:
-            self.logger.error("索引创建失败", 
+            self.logger.error("数据插入失败", 
                             collection_name=collection_name,
                             error=str(e))
-            raise VectorDBError(f"为集合 {collection_name} 创建索引失败: {e}")
+            raise VectorDBError(f"插入数据到集合 {collection_name} 失败: {e}")
     
-    def _ensure_index_exists(self, collection_name: str) -> None:
-        """确保索引存在，如果不存在则创建"""
+    def _insert_one_batch(self, 
+                          batch: List[Dict[str, Any]], 
+                          collection_name: str,
+                          batch_num: int,
+                          normalize: bool = False) -> int:
+        """写入单个批次，返回成功写入条数；失败只记录日志并返回0"""
+        try:
+            insert_data, _ = _rows_from_entities(batch, normalize=normalize)
+            res = self.client.upsert(collection_name, insert_data)
+            return res.get('upsert_count', len(batch))
+        except Exception as batch_error:
+            self.logger.error("批次数据插入失败", 
+                            collection_name=collection_name,
+                            batch_num=batch_num,
+                            error=str(batch_error))
+            return 0
+    
+    def _create_index_immediately(self, 
+                                  collection_name: str, 
+                                  metric_type: str = "COSINE",
+                                  index_type: str = "FLAT",
+                                  nlist: Optional[int] = None,
+                                  if_not_exists: bool = False,
+                                  unit_l2: bool = False) -> None:
+        """
+        在集合创建后立即建立索引
+        
+        Args:
+            collection_name: 集合名称
+            metric_type: 相似度度量方式
+            index_type: 索引类型，FLAT适合小数据集，IVF_FLAT/IVF_SQ8/IVF_PQ/HNSW适合大规模数据
+            nlist: IVF索引的聚类中心数，默认取 settings.ivf_nlist
+            if_not_exists: 向量字段已有索引时视为成功，保留原索引
+            unit_l2: 以单位向量的L2距离代替COSINE/IP，并在集合属性上标记
+        """
         try:
-            # 检查是否已有索引
-            index_info = self.client.describe_index(collection_name, "vector")
-            self.logger.info("索引已存在", collection_name=collection_name)
-        except:
-            # 索引不存在，尝试创建 - 使用官方推荐的方式
+            index_params, index_type, params = self._prepare_index(collection_name, metric_type, index_type, nlist)
+            
             try:
-                from pymilvus import MilvusClient
-                
-                # 使用官方推荐的索引参数准备方法
-                index_params = MilvusClient.prepare_index_params()
-                
-                index_params.add_index(
-                    field_name="vector",  # 向量字段名称
-                    index_type="FLAT",   # 索引类型
-                    index_name="vector_index",  # 索引名称
-                    metric_type=settings.similarity_metric,  # 相似度度量
-                    params={}  # FLAT索引不需要额外参数
-                )
-                
                 self.client.create_index(
                     collection_name=collection_name,
                     index_params=index_params
                 )
-                self.logger.info("索引创建成功", collection_name=collection_name)
-            except Exception as create_error:
-                self.logger.warning("索引创建失败", 
-                                  collection_name=collection_name,
-                                  error=str(create_error))
+            except MilvusException as e:
+                if not (if_not_exists and e.code in _INDEX_EXISTS_CODES):
+                    raise
+                self._indexed.add(collection_name)
+                self.logger.debug("索引已存在", collection_name=collection_name)
+                return
+            if unit_l2:
+                self.client.alter_collection_properties(collection_name, {_UNIT_L2_PROPERTY: "true"})
+            self._record_index(collection_name, index_type, metric_type, unit_l2, params)
+            
+        except Exception as e:
+            self.logger.error("索引创建失败", 
+                            collection_name=collection_name,
+                            error=str(e))
+            raise VectorDBError(f"为集合 {collection_name} 创建索引失败: {e}")
+    
+    def _prepare_index(self, 
+                       collection_name: str, 
+                       metric_type: str, 
+                       index_type: str, 
+                       nlist: Optional[int] = None) -> Tuple[Any, str, Dict[str, Any]]:
+        """
+        组装向量字段的建索引参数，同步与异步建索引共用
+        
+        Returns:
+            Tuple: (IndexParams, 实际使用的索引类型, 建索引参数)
+        """
+        if index_type in self._UNSUPPORTED_INDEX_TYPES:
+            self.logger.warning("当前数据库不支持该索引类型，改用IVF_SQ8", 
+                              collection_name=collection_name,
+                              index_type=index_type)
+            index_type = "IVF_SQ8"
+        
+        params = _index_build_params(index_type, nlist)
+        
+        # 使用官方推荐的索引参数准备方法
+        index_params = MilvusClient.prepare_index_params()
+        
+        index_params.add_index(
+            field_name="vector",  # 向量字段名称
+            index_type=index_type,  # 索引类型
+            index_name="vector_index",  # 索引名称
+            metric_type=metric_type,  # 相似度度量
+            params=params
+        )
+        return index_params, index_type, params
+    
+    def _record_index(self, 
+                      collection_name: str, 
+                      index_type: str, 
+                      metric_type: str, 
+                      unit_l2: bool, 
+                      params: Dict[str, Any]) -> None:
+        """记录新建索引的描述，之后的搜索和写入不再查询"""
+        self._index_info[collection_name] = {
+            "index_type": index_type,
+            "metric_type": metric_type,
+            "unit_l2": unit_l2,
+        }
+        self._indexed.add(collection_name)
+        
+        self.logger.info("索引创建成功", 
+                       collection_name=collection_name,
+                       index_type=index_type,
+                       metric_type=metric_type,
+                       **params)
+    
+    @staticmethod
+    def _default_index_spec() -> Tuple[str, str, bool]:
+        """按当前配置推断补建索引的 (度量方式, 索引类型, 是否单位L2)"""
+        index_type = settings.get_index_type()
+        unit_l2 = _unit_l2_enabled(index_type, settings.similarity_metric)
+        return ("L2" if unit_l2 else settings.similarity_metric), index_type, unit_l2
+    
+    def _ensure_index_exists(self, collection_name: str) -> None:
+        """
+        确保索引存在，如果不存在则按当前配置创建
+        
+        每个集合只检查一次：list_indexes有结果即视为已建索引；建索引时与其他进程
+        竞争失败也以"索引已存在"的错误码判定。结果按集合缓存，之后的调用不再发起请求。
+        """
+        if collection_name in self._indexed:
+            return
+        # pymilvus会为失败的RPC打印错误日志，先用list_indexes确认，避免已有索引时报错刷屏
+        if self.client.list_indexes(collection_name):
+            self._indexed.add(collection_name)
+            return
+        metric_type, index_type, unit_l2 = self._default_index_spec()
+        try:
+            self._create_index_immediately(
+                collection_name,
+                metric_type,
+                index_type,
+                if_not_exists=True,
+                unit_l2=unit_l2
+            )
+        except VectorDBError as create_error:
+            self.logger.warning("索引创建失败", 
+                              collection_name=collection_name,
+                              error=str(create_error))
     
     def search(self, 
                collection_name: str, 
-               query_vectors: List[List[float]],
+               query_vectors: Sequence[np.ndarray],
                top_k: Optional[int] = None,
                search_params: Optional[Dict[str, Any]] = None,
-               filter_expr: Optional[str] = None) -> List[List[SearchResult]]:
+               filter_expr: Optional[str] = None,
+               output_fields: Optional[List[str]] = None) -> List[List[SearchResult]]:
         """
         向量相似性搜索
         
@@ -449,73 +1370,31 @@ class LocalVectorDB(BaseVectorDB):
             top_k: 返回结果数量
             search_params: 搜索参数
             filter_expr: 过滤表达式
+            output_fields: 返回的标量字段，默认只取metadata；
+                text_for_embedding可能很长，需要时显式传入，结果中放在SearchResult.text
         """
         top_k = top_k or settings.top_k
-        search_params = search_params or {"params": {}}
+        request, queries, metric, rerank = self._search_request(
+            collection_name, query_vectors, top_k, search_params, filter_expr, output_fields,
+            self._vector_index(collection_name)
+        )
         
         try:
-            import time
             start_time = time.time()
             
-            # 确保集合已加载
-            if not self.client.has_collection(collection_name):
-                raise VectorDBError(f"集合 {collection_name} 不存在")
-            
-            # 加载集合到内存中
-            try:
+            # 首次搜索时加载集合（同步完成），之后不再发起加载请求；
+            # 集合不存在时由服务端报错
+            if collection_name not in self._loaded:
+                self._ensure_index_exists(collection_name)
                 self.client.load_collection(collection_name)
-                # 等待片刻让索引完全加载
-                time.sleep(0.1)
-            except Exception as load_error:
-                self.logger.warning("集合加载警告", 
-                                  collection_name=collection_name,
-                                  error=str(load_error))
-            
-            # 简化搜索参数以支持Milvus Lite
-            search_kwargs = {
-                "collection_name": collection_name,
-                "data": query_vectors,
-                "anns_field": "vector",
-                "limit": top_k,
-                "output_fields": ["text_for_embedding", "metadata"],
-            }
-            
-            # 对于Milvus Lite，可能不需要搜索参数
-            if filter_expr:
-                search_kwargs["filter"] = filter_expr
-            
-            results = self.client.search(**search_kwargs)
+                self._loaded.add(collection_name)
+            
+            results = self.client.search(**request)
+            if rerank:
+                results = self._rerank(results, queries, metric, top_k)
             search_time = time.time() - start_time
             
-            # 处理搜索结果
-            processed_results = []
-            for query_result in results:
-                query_processed = []
-                for hit in query_result:
-                    # 计算标准化相似度分数 (0-1范围)
-                    if settings.similarity_metric == "COSINE":
-                        # COSINE: distance范围是[-1, 1], 转换为[0, 1]
-                        normalized_score = (hit.distance + 1) / 2
-                    elif settings.similarity_metric == "L2":
-                        # L2: distance越小越相似，转换为相似度分数
-                        normalized_score = 1 / (1 + hit.distance)
-                    else:
-                        # 其他度量方式
-                        normalized_score = max(0, min(1, hit.distance))
-                    
-                    metadata = hit.get("entity", {}).get("metadata", {})
-                    
-                    search_result = SearchResult(
-                        id=hit.id,
-                        score=normalized_score,
-                        metadata=metadata,
-                        distance=hit.distance
-                    )
-                    query_processed.append(search_result)
-                
-                # 按相似度分数排序（降序）
-                query_processed.sort(key=lambda x: x.score, reverse=True)
-                processed_results.append(query_processed)
+            processed_results = self._to_search_results(results, metric)
             
             self.logger.debug("搜索完成", 
                             collection_name=collection_name,
@@ -531,10 +1410,123 @@ class LocalVectorDB(BaseVectorDB):
                             error=str(e))
             raise SearchError(f"在集合 {collection_name} 中搜索失败: {e}")
     
+    def _search_request(self, 
+                        collection_name: str, 
+                        query_vectors: Sequence[np.ndarray],
+                        top_k: int,
+                        search_params: Optional[Dict[str, Any]],
+                        filter_expr: Optional[str],
+                        output_fields: Optional[List[str]],
+                        index: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Sequence[np.ndarray], str, bool]:
+        """
+        组装搜索请求，同步与异步搜索共用；不发起任何请求
+        
+        Args:
+            index: 集合向量索引的描述（_vector_index的结果），尚无索引时为None
+        
+        Returns:
+            Tuple: (search参数, 处理后的查询向量, 分数换算用的度量方式, 是否需要重排)
+        """
+        index_type = index.get("index_type") if index else None
+        # IVF_PQ的距离是量化近似值：多取候选，再按原始向量精确重排
+        rerank = index_type == "IVF_PQ" and settings.vector_dtype == VectorDType.FLOAT32
+        limit = top_k * settings.pq_rerank_factor if rerank else top_k
+        search_params = search_params or _index_search_params(index_type, limit)
+        
+        # 度量方式取自集合的索引；单位L2模式下查询向量与入库向量做相同的归一化
+        metric = self._metric_for_index(index)
+        if metric == "UNIT_L2":
+            queries = _unit_rows(np.asarray(query_vectors, dtype=np.float32))
+        else:
+            queries = query_vectors
+        
+        output_fields = ["metadata"] if output_fields is None else list(output_fields)
+        if rerank and "vector" not in output_fields:
+            output_fields.append("vector")
+        
+        # 简化搜索参数以支持Milvus Lite
+        request = {
+            "collection_name": collection_name,
+            "data": [_encode_query(vector) for vector in queries],
+            "anns_field": "vector",
+            "limit": limit,
+            "output_fields": output_fields,
+            "search_params": search_params,
+        }
+        
+        # 对于Milvus Lite，可能不需要搜索参数
+        if filter_expr:
+            request["filter"] = filter_expr
+        
+        return request, queries, metric, rerank
+    
+    @staticmethod
+    def _to_search_results(results: List[List[Any]], metric: str) -> List[List[SearchResult]]:
+        """
+        将Milvus返回的命中转换为SearchResult
+        
+        所有查询的距离一次换算为分数；Milvus已按相似度从高到低返回，无需再排序。
+        """
+        # pymilvus的Hit继承dict，但其get、id、distance和entity都经过Python层的回退查找；
+        # 这里直接用dict.get读取底层字典，entity取到的就是字段字典本身
+        get = dict.get
+        score_fn = _SCORE_FUNCTIONS.get(metric, _clip_scores)
+        counts = [len(query_result) for query_result in results]
+        distances = np.fromiter((get(hit, "distance") for query_result in results for hit in query_result),
+                                dtype=np.float32, count=sum(counts))
+        raw_distances = distances.tolist()
+        scores = score_fn(distances).tolist()
+        
+        processed_results = []
+        position = 0
+        for query_result, count in zip(results, counts):
+            query_processed = []
+            for offset, hit in enumerate(query_result, position):
+                entity = get(hit, "entity") or {}
+                query_processed.append(SearchResult(
+                    id=get(hit, "id"),
+                    score=scores[offset],
+                    metadata=entity.get("metadata") or {},
+                    distance=raw_distances[offset],
+                    text=entity.get("text_for_embedding")
+                ))
+            processed_results.append(query_processed)
+            position += count
+        return processed_results
+    
+    @staticmethod
+    def _rerank(results: List[List[Any]], 
+                queries: Sequence[np.ndarray], 
+                metric: str, 
+                top_k: int) -> List[List[Any]]:
+        """按原始向量重新计算候选的距离，取前top_k并写回精确距离"""
+        descending = metric in ("COSINE", "IP")
+        reranked = []
+        for query, hits in zip(queries, results):
+            if not hits:
+                reranked.append([])
+                continue
+            candidates = np.asarray([hit["entity"]["vector"] for hit in hits], dtype=np.float32)
+            distances = _exact_distances(metric, np.asarray(query, dtype=np.float32), candidates)
+            keys = -distances if descending else distances
+            # 候选数是top_k的若干倍：先O(n)选出前top_k，只对这部分排序
+            if len(keys) > top_k:
+                order = np.argpartition(keys, top_k - 1)[:top_k]
+                order = order[np.argsort(keys[order], kind="stable")]
+            else:
+                order = np.argsort(keys, kind="stable")
+            kept = []
+            for i in order.tolist():
+                hit = hits[i]
+                hit["distance"] = float(distances[i])
+                kept.append(hit)
+            reranked.append(kept)
+        return reranked
+    
     def get_collection_info(self, collection_name: str) -> CollectionInfo:
         """获取集合详细信息"""
         try:
-            if not self.client.has_collection(collection_name):
+            if not self._has(collection_name):
                 raise CollectionError(f"集合 {collection_name} 不存在")
             
             # 获取集合描述
@@ -547,7 +1539,7 @@ class LocalVectorDB(BaseVectorDB):
             # 获取索引信息
             try:
                 index_info = self.client.describe_index(collection_name, "vector")
-            except:
+            except MilvusException:
                 index_info = None
             
             return CollectionInfo(
@@ -571,9 +1563,245 @@ class LocalVectorDB(BaseVectorDB):
             )
 
 
+class AsyncLocalVectorDB(LocalVectorDB):
+    """
+    基于AsyncMilvusClient的本地向量数据库
+    
+    search_async / upsert_async 直接在事件循环上等待响应，不占用线程池，
+    大量并发协程复用同一个异步客户端；其中的索引、维度查询和补建索引也经异步客户端，
+    结果与同步路径共用缓存。建集合等低频的管理操作仍走同步客户端。
+    """
+    
+    def __init__(self, db_path: Optional[str] = None):
+        super().__init__(db_path)
+        self.aclient: Optional[AsyncMilvusClient] = None
+        self.logger = get_logger("AsyncLocalVectorDB")
+    
+    async def connect_async(self) -> bool:
+        """连接数据库：同步客户端用于管理操作，异步客户端用于读写"""
+        self.connect()
+        try:
+            self.aclient = AsyncMilvusClient(uri=self.db_path)
+            self.logger.info("异步客户端连接成功", db_path=self.db_path)
+            return True
+        except Exception as e:
+            self.logger.error("异步客户端连接失败", error=str(e), db_path=self.db_path)
+            raise ConnectionError(f"无法创建异步客户端: {e}")
+    
+    async def close_async(self) -> None:
+        """关闭异步客户端并归还同步客户端"""
+        if self.aclient is not None:
+            try:
+                await self.aclient.close()
+            except Exception as e:
+                self.logger.warning("关闭异步客户端时出错", error=str(e))
+            self.aclient = None
+        self.close()
+    
+    async def search_async(self, 
+                           collection_name: str, 
+                           query_vectors: Sequence[np.ndarray],
+                           top_k: Optional[int] = None,
+                           search_params: Optional[Dict[str, Any]] = None,
+                           filter_expr: Optional[str] = None,
+                           output_fields: Optional[List[str]] = None) -> List[List[SearchResult]]:
+        """向量相似性搜索（异步），参数与 search 相同"""
+        top_k = top_k or settings.top_k
+        request, queries, metric, rerank = self._search_request(
+            collection_name, query_vectors, top_k, search_params, filter_expr, output_fields,
+            await self._vector_index_async(collection_name)
+        )
+        
+        try:
+            start_time = time.time()
+            
+            if collection_name not in self._loaded:
+                await self._ensure_index_exists_async(collection_name)
+                await self.aclient.load_collection(collection_name)
+                self._loaded.add(collection_name)
+            
+            results = await self.aclient.search(**request)
+            if rerank:
+                results = self._rerank(results, queries, metric, top_k)
+            processed_results = self._to_search_results(results, metric)
+            
+            self.logger.debug("搜索完成", 
+                            collection_name=collection_name,
+                            query_count=len(query_vectors),
+                            top_k=top_k,
+                            search_time=f"{time.time() - start_time:.3f}s")
+            
+            return processed_results
+            
+        except Exception as e:
+            self.logger.error("搜索失败", 
+                            collection_name=collection_name,
+                            error=str(e))
+            raise SearchError(f"在集合 {collection_name} 中搜索失败: {e}")
+    
+    async def search_stream(self, 
+                            collection_name: str, 
+                            vectors: np.ndarray,
+                            top_k: Optional[int] = None,
+                            batch_size: Optional[int] = None,
+                            filter_expr: Optional[str] = None,
+                            output_fields: Optional[List[str]] = None) -> AsyncIterator[List[SearchResult]]:
+        """分批异步搜索，下一批请求在产出当前批结果之前发出"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[np.newaxis, :]
+        batch_size = batch_size or settings.batch_size
+        
+        pending = None
+        for start in range(0, len(vectors), batch_size):
+            task = asyncio.ensure_future(self.search_async(
+                collection_name, vectors[start:start + batch_size], top_k=top_k, 
+                filter_expr=filter_expr, output_fields=output_fields
+            ))
+            if pending is not None:
+                for result in await pending:
+                    yield result
+            pending = task
+        
+        if pending is not None:
+            for result in await pending:
+                yield result
+    
+    async def upsert_async(self, 
+                           entities: List[Dict[str, Any]], 
+                           collection_name: str,
+                           batch_size: Optional[int] = None,
+                           flush: bool = False) -> bool:
+        """
+        并发批量插入或更新数据
+        
+        各批次的写入请求同时在事件循环上等待，不经过线程池。
+        
+        Args:
+            entities: 实体数据列表
+            collection_name: 集合名称
+            batch_size: 批处理大小
+            flush: 是否在写入后刷盘并加载集合
+        """
+        batch_size = batch_size or settings.batch_size
+        
+        try:
+            if not entities:
+                self.logger.warning("没有数据需要插入")
+                return True
+            self._verify_dims(collection_name, self._entity_dims(entities), 
+                              await self._vector_dim_async(collection_name))
+            
+            batches = [entities[i:i + batch_size] for i in range(0, len(entities), batch_size)]
+            index = await self._vector_index_async(collection_name)
+            normalize = self._metric_for_index(index) == "UNIT_L2"
+            counts = await asyncio.gather(*(
+                self._upsert_one_batch_async(batch, collection_name, batch_num, normalize)
+                for batch_num, batch in enumerate(batches, 1)
+            ))
+            successful_inserts = sum(counts)
+            
+            self.logger.info("数据并发插入完成", 
+                           collection_name=collection_name,
+                           total_entities=len(entities),
+                           successful_inserts=successful_inserts,
+                           total_batches=len(batches))
+            
+            if flush and successful_inserts > 0:
+                await self.aclient.flush(collection_name)
+                await self.aclient.load_collection(collection_name)
+                self._loaded.add(collection_name)
+            
+            return successful_inserts > 0
+            
+        except Exception as e:
+            self.logger.error("数据插入失败", 
+                            collection_name=collection_name,
+                            error=str(e))
+            raise VectorDBError(f"插入数据到集合 {collection_name} 失败: {e}")
+    
+    async def _vector_dim_async(self, collection_name: str) -> Optional[int]:
+        """_vector_dim 的异步版本，经异步客户端查询，与同步版本共用缓存"""
+        if collection_name not in self._vector_dims:
+            try:
+                description = await self.aclient.describe_collection(collection_name)
+            except MilvusException:
+                return None
+            dim = _dim_from_description(description)
+            if dim is None:
+                return None
+            self._vector_dims[collection_name] = dim
+        return self._vector_dims[collection_name]
+    
+    async def _vector_index_async(self, collection_name: str) -> Optional[Dict[str, Any]]:
+        """_vector_index 的异步版本，经异步客户端查询，与同步版本共用缓存"""
+        if collection_name not in self._index_info:
+            try:
+                names = await self.aclient.list_indexes(collection_name, field_name="vector")
+                if not names:
+                    return None
+                self._index_info[collection_name] = _index_from_description(
+                    await self.aclient.describe_index(collection_name, names[0]),
+                    await self.aclient.describe_collection(collection_name)
+                )
+            except Exception:
+                return None
+        return self._index_info[collection_name]
+    
+    async def _ensure_index_exists_async(self, collection_name: str) -> None:
+        """_ensure_index_exists 的异步版本，检查和补建索引都经异步客户端"""
+        if collection_name in self._indexed:
+            return
+        if await self.aclient.list_indexes(collection_name):
+            self._indexed.add(collection_name)
+            return
+        metric_type, index_type, unit_l2 = self._default_index_spec()
+        try:
+            index_params, index_type, params = self._prepare_index(collection_name, metric_type, index_type)
+            try:
+                await self.aclient.create_index(collection_name=collection_name, index_params=index_params)
+            except MilvusException as e:
+                if e.code not in _INDEX_EXISTS_CODES:
+                    raise
+                self._indexed.add(collection_name)
+                self.logger.debug("索引已存在", collection_name=collection_name)
+                return
+            except Exception:
+                # Milvus Lite未实现异步客户端等待索引构建所需的alloc_timestamp：
+                # 建索引请求已成功、只是等待失败，以list_indexes确认索引已存在
+                if not await self.aclient.list_indexes(collection_name, field_name="vector"):
+                    raise
+            if unit_l2:
+                await self.aclient.alter_collection_properties(collection_name, {_UNIT_L2_PROPERTY: "true"})
+            self._record_index(collection_name, index_type, metric_type, unit_l2, params)
+        except Exception as create_error:
+            self.logger.warning("索引创建失败", 
+                              collection_name=collection_name,
+                              error=str(create_error))
+    
+    async def _upsert_one_batch_async(self, 
+                                      batch: List[Dict[str, Any]], 
+                                      collection_name: str,
+                                      batch_num: int,
+                                      normalize: bool = False) -> int:
+        """写入单个批次，返回成功写入条数；失败只记录日志并返回0"""
+        try:
+            insert_data, _ = _rows_from_entities(batch, normalize=normalize)
+            res = await self.aclient.upsert(collection_name, insert_data)
+            return res.get('upsert_count', len(batch))
+        except Exception as batch_error:
+            self.logger.error("批次数据插入失败", 
+                            collection_name=collection_name,
+                            batch_num=batch_num,
+                            error=str(batch_error))
+            return 0
+
+
 class ServerVectorDB(LocalVectorDB):
     """Milvus服务器向量数据库管理器"""
     
+    _UNSUPPORTED_INDEX_TYPES = frozenset()
+    
     def __init__(self, 
                  host: Optional[str] = None,
                  port: Optional[int] = None,
@@ -588,12 +1816,12 @@ class ServerVectorDB(LocalVectorDB):
             username: 用户名
             password: 密码
         """
+        super().__init__()
         self.host = host or settings.milvus_host
         self.port = port or settings.milvus_port
         self.username = username or settings.milvus_username
         self.password = password or settings.milvus_password
         self.logger = get_logger("ServerVectorDB")
-        self.client = None
         
     def connect(self) -> bool:
         """连接到Milvus服务器"""
@@ -608,10 +1836,11 @@ class ServerVectorDB(LocalVectorDB):
                     "password": self.password
                 })
             
-            self.client = MilvusClient(**connect_params)
+            self._acquire_client(**connect_params)
             
             # 测试连接
             if not self.health_check():
+                self._discard_client()
                 raise ConnectionError("连接测试失败")
                 
             self.logger.info("Milvus服务器连接成功", 
@@ -658,6 +1887,13 @@ def create_local_db(db_path: Optional[str] = None) -> LocalVectorDB:
     return db
 
 
+async def create_async_local_db(db_path: Optional[str] = None) -> AsyncLocalVectorDB:
+    """创建并连接基于异步客户端的本地向量数据库实例"""
+    db = AsyncLocalVectorDB(db_path)
+    await db.connect_async()
+    return db
+
+
 def create_server_db(host: str, port: int = 19530, 
                     username: Optional[str] = None, 
                     password: Optional[str] = None) -> ServerVectorDB:
@@ -1,286 +0,0 @@
-#!/usr/bin/env python3
-"""
-系统测试脚本 - 验证改进后的代码是否正常工作
-"""
-import sys
-import traceback
-from pathlib import Path
-
-# 添加源码路径
-sys.path.insert(0, str(Path(__file__).parent / "src"))
-
-def test_imports():
-    """测试所有模块是否可以正常导入"""
-    print("🧪 测试模块导入...")
-    
-    try:
-        from perspective_kb.config import settings, LogLevel, VectorDBType
-        print("  ✅ config 模块导入成功")
-        
-        from perspective_kb.utils import get_logger, console
-        print("  ✅ utils 模块导入成功")
-        
-        # 注意：vector_db 和 data_helper 可能因为缺少依赖而失败
-        try:
-            from perspective_kb.vector_db import BaseVectorDB, LocalVectorDB
-            print("  ✅ vector_db 模块导入成功")
-        except ImportError as e:
-            print(f"  ⚠️  vector_db 模块导入失败 (预期): {e}")
-            
-        try:
-            from perspective_kb.data_helper import DataHelper
-            print("  ✅ data_helper 模块导入成功")
-        except ImportError as e:
-            print(f"  ⚠️  data_helper 模块导入失败 (预期): {e}")
-            
-        from perspective_kb.cli import app
-        print("  ✅ cli 模块导入成功")
-        
-        return True
-    except Exception as e:
-        print(f"  ❌ 导入失败: {e}")
-        traceback.print_exc()
-        return False
-
-
-def test_config():
-    """测试配置模块"""
-    print("\n🧪 测试配置模块...")
-    
-    try:
-        from perspective_kb.config import settings, create_settings, LogLevel, VectorDBType
-        
-        # 测试基本配置
-        print(f"  应用名称: {settings.app_name}")
-        print(f"  应用版本: {settings.app_version}")
-        print(f"  数据库类型: {settings.vector_db_type}")
-        print(f"  向量维度: {settings.vector_dim}")
-        print(f"  日志级别: {settings.log_level}")
-        
-        # 测试配置方法
-        db_uri = settings.get_database_uri()
-        print(f"  数据库URI: {db_uri}")
-        
-        ollama_config = settings.get_ollama_config()
-        print(f"  Ollama配置: {ollama_config}")
-        
-        # 测试配置工厂
-        custom_settings = create_settings(debug=True, batch_size=50)
-        print(f"  自定义配置测试: debug={custom_settings.debug}, batch_size={custom_settings.batch_size}")
-        
-        # 测试目录创建
-        settings.ensure_directories()
-        print(f"  目录创建成功")
-        
-        print("  ✅ 配置模块测试通过")
-        return True
-        
-    except Exception as e:
-        print(f"  ❌ 配置模块测试失败: {e}")
-        traceback.print_exc()
-        return False
-
-
-def test_utils():
-    """测试工具模块"""
-    print("\n🧪 测试工具模块...")
-    
-    try:
-        from perspective_kb.utils import get_logger, console, ensure_directory
-        
-        # 测试日志
-        logger = get_logger("test")
-        logger.info("测试日志消息")
-        print("  ✅ 日志系统正常")
-        
-        # 测试控制台
-        console.print("[green]测试控制台输出[/green]")
-        print("  ✅ 控制台输出正常")
-        
-        # 测试目录创建
-        test_dir = Path("test_temp_dir")
-        ensure_directory(test_dir)
-        if test_dir.exists():
-            test_dir.rmdir()  # 清理
-            print("  ✅ 目录创建功能正常")
-        
-        print("  ✅ 工具模块测试通过")
-        return True
-        
-    except Exception as e:
-        print(f"  ❌ 工具模块测试失败: {e}")
-        traceback.print_exc()
-        return False
-
-
-def test_data_structure():
-    """测试数据结构"""
-    print("\n🧪 测试数据结构...")
-    
-    try:
-        # 检查示例数据文件
-        from perspective_kb.config import settings
-        
-        canonical_dir = settings.canonical_perspectives_dir
-        feedback_dir = settings.user_feedbacks_dir
-        
-        print(f"  知识库目录: {canonical_dir}")
-        print(f"  反馈目录: {feedback_dir}")
-        
-        if canonical_dir.exists():
-            json_files = list(canonical_dir.glob("*.json"))
-            print(f"  知识库JSON文件数: {len(json_files)}")
-        else:
-            print(f"  ⚠️  知识库目录不存在")
-            
-        if feedback_dir.exists():
-            json_files = list(feedback_dir.glob("*.json"))
-            print(f"  反馈JSON文件数: {len(json_files)}")
-        else:
-            print(f"  ⚠️  反馈目录不存在")
-        
-        print("  ✅ 数据结构检查完成")
-        return True
-        
-    except Exception as e:
-        print(f"  ❌ 数据结构测试失败: {e}")
-        traceback.print_exc()
-        return False
-
-
-def test_cli_structure():
-    """测试CLI结构"""
-    print("\n🧪 测试CLI结构...")
-    
-    try:
-        from perspective_kb.cli import app
-        
-        # 检查命令是否存在 - 在typer 0.15+中使用不同的方式获取命令
-        try:
-            # 尝试新的方式
-            commands = list(app.registered_commands.keys()) if hasattr(app, 'registered_commands') else []
-        except:
-            # 回退到检查方法
-            commands = []
-            for attr_name in dir(app):
-                if not attr_name.startswith('_') and hasattr(getattr(app, attr_name), '__call__'):
-                    commands.append(attr_name)
-        
-        expected_commands = ["process", "status", "search", "collections", "clean", "config", "benchmark"]
-        
-        print(f"  可用命令检查: {len(commands)} 个命令")
-        
-        # 简化测试 - 只检查CLI应用是否可以创建
-        print("    ✅ CLI应用创建成功")
-        print("    ✅ CLI结构正常")
-        
-        print("  ✅ CLI结构测试完成")
-        return True
-        
-    except Exception as e:
-        print(f"  ❌ CLI结构测试失败: {e}")
-        traceback.print_exc()
-        return False
-
-
-def check_dependencies():
-    """检查依赖项状态"""
-    print("\n🧪 检查依赖项状态...")
-    
-    dependencies = [
-        ("pydantic", "配置管理"),
-        ("typer", "CLI界面"),
-        ("rich", "终端输出"),
-        ("structlog", "日志系统"),
-        ("pymilvus", "向量数据库"),
-        ("ollama", "嵌入模型"),
-        ("tqdm", "进度条"),
-        ("numpy", "数值计算"),
-        ("pandas", "数据处理")
-    ]
-    
-    available = []
-    missing = []
-    
-    for package, description in dependencies:
-        try:
-            __import__(package)
-            available.append((package, description))
-            print(f"  ✅ {package} ({description})")
-        except ImportError:
-            missing.append((package, description))
-            print(f"  ❌ {package} ({description}) - 未安装")
-    
-    print(f"\n依赖项状态:")
-    print(f"  可用: {len(available)}/{len(dependencies)}")
-    print(f"  缺失: {len(missing)}/{len(dependencies)}")
-    
-    if missing:
-        print(f"\n安装缺失依赖项的命令:")
-        print(f"  pixi install")
-        print(f"  # 或者")
-        print(f"  pip install {' '.join(pkg for pkg, _ in missing)}")
-    
-    return len(missing) == 0
-
-
-def main():
-    """主测试函数"""
-    print("🚀 系统测试开始 - 验证2025年改进后的代码\n")
-    
-    test_results = []
-    
-    # 运行各项测试
-    tests = [
-        ("模块导入", test_imports),
-        ("配置模块", test_config),
-        ("工具模块", test_utils),
-        ("数据结构", test_data_structure),
-        ("CLI结构", test_cli_structure),
-    ]
-    
-    for test_name, test_func in tests:
-        try:
-            result = test_func()
-            test_results.append((test_name, result))
-        except Exception as e:
-            print(f"❌ {test_name} 测试异常: {e}")
-            test_results.append((test_name, False))
-    
-    # 检查依赖项
-    deps_ok = check_dependencies()
-    
-    # 总结
-    print("\n" + "="*50)
-    print("📊 测试总结")
-    print("="*50)
-    
-    passed = sum(1 for _, result in test_results if result)
-    total = len(test_results)
-    
-    for test_name, result in test_results:
-        status = "✅ 通过" if result else "❌ 失败"
-        print(f"  {test_name}: {status}")
-    
-    print(f"\n总体结果: {passed}/{total} 测试通过")
-    
-    if deps_ok:
-        print("✅ 所有依赖项都已安装")
-    else:
-        print("⚠️  部分依赖项缺失 - 请安装后重新测试")
-    
-    if passed == total and deps_ok:
-        print("\n🎉 所有测试通过！系统已准备就绪。")
-        return True
-    else:
-        print("\n⚠️  部分测试失败或依赖项缺失。")
-        print("💡 建议:")
-        print("  1. 安装缺失的依赖项: pixi install")
-        print("  2. 检查数据目录和配置")
-        print("  3. 重新运行测试")
-        return False
-
-
-if __name__ == "__main__":
-    success = main()
-    sys.exit(0 if success else 1)
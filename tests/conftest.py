@@ -0,0 +1,95 @@
+"""
+pytest共享fixture
+
+VectorDB相关的mock统一用 ``Mock(spec_set=MilvusClient)``：只校验属性名，
+不像 ``create_autospec`` 那样递归检查签名，构建开销小得多；确需autospec时
+传 ``instance=True``，只构建实例mock。
+"""
+import copy
+import functools
+from unittest.mock import Mock
+
+import pytest
+
+# pymilvus / ollama 只在用到相应fixture时才导入，只跑配置类测试时不加载
+from perspective_kb.config import Settings
+
+
+def pytest_addoption(parser):
+    parser.addoption("--deep-check", action="store_true", default=False,
+                     help="实际导入各依赖项并检查版本号（默认只检查是否安装）")
+
+
+def fast_milvus_mock() -> Mock:
+    """构建MilvusClient实例的mock，访问不存在的属性会报错"""
+    from pymilvus import MilvusClient
+    return Mock(spec_set=MilvusClient)
+
+
+@functools.lru_cache(maxsize=None)
+def _milvus_template() -> Mock:
+    """
+    MilvusClient的mock模板，首次使用时构建一次，每个测试取一份浅拷贝；
+    拷贝与模板共享return_value，测试中只在副本上设置side_effect
+    """
+    template = Mock(name="MilvusClient", return_value=fast_milvus_mock())
+    template.return_value.list_collections.return_value = []
+    template.return_value.has_collection.return_value = False
+    return template
+
+
+@pytest.fixture
+def milvus_client(monkeypatch):
+    """以mock替换vector_db中的MilvusClient，并清空进程级连接池"""
+    from perspective_kb import vector_db
+    
+    client = copy.copy(_milvus_template())
+    monkeypatch.setattr(vector_db, "MilvusClient", client)
+    vector_db.reset_client_pool()
+    yield client
+    vector_db.reset_client_pool()
+
+
+@pytest.fixture
+def local_db(milvus_client, tmp_path):
+    """
+    连接到mock客户端的LocalVectorDB
+    
+    每个测试换用全新的客户端实例mock，调用记录和返回值设置不会带到其他测试。
+    """
+    from perspective_kb.vector_db import LocalVectorDB
+    
+    client = fast_milvus_mock()
+    client.list_collections.return_value = []
+    client.has_collection.return_value = False
+    milvus_client.return_value = client
+    db = LocalVectorDB(str(tmp_path / "test.db"))
+    db.connect()
+    yield db
+    db.close()
+
+
+@pytest.fixture(scope="session")
+def default_settings() -> Settings:
+    """
+    各字段取默认值的配置，跳过Pydantic校验和环境变量解析
+    
+    只需要默认值的测试共用这一份；需要验证环境变量解析的测试仍直接构造Settings。
+    """
+    return Settings.model_construct(
+        vector_dim=1024,
+        batch_size=100,
+        max_workers=4,
+        ollama_host="http://localhost:11434"
+    )
+
+
+@pytest.fixture(scope="session")
+def helper():
+    """
+    整个测试会话共用的DataHelper（不启用嵌入缓存）
+    
+    文本构建类方法不修改实例状态；需要修改状态的测试先 ``copy.copy(helper)``。
+    """
+    from perspective_kb.data_helper import DataHelper
+    return DataHelper(enable_cache=False)
@@ -0,0 +1,16 @@
+"""
+CLI结构测试
+"""
+from perspective_kb.cli import app
+
+# 注册的命令名只计算一次；未显式指定name时typer使用回调函数名（下划线转连字符）
+_CLI_COMMANDS = tuple(
+    c.name or c.callback.__name__.replace("_", "-")
+    for c in getattr(app, "registered_commands", [])
+)
+
+
+def test_cli_structure():
+    """测试CLI注册了全部命令"""
+    expected_commands = {"process", "status", "search", "collections", "clean", "config", "benchmark"}
+    assert set(_CLI_COMMANDS) >= expected_commands, f"缺少命令: {expected_commands - set(_CLI_COMMANDS)}"
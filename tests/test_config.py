@@ -0,0 +1,69 @@
+"""
+配置模块测试
+"""
+import pytest
+
+
+def test_config():
+    """测试全局配置和配置方法"""
+    from perspective_kb.config import settings, VectorDBType
+    
+    assert settings.app_name
+    assert settings.app_version
+    assert isinstance(settings.vector_db_type, VectorDBType)
+    assert settings.vector_dim > 0
+    
+    assert settings.get_database_uri()
+    assert settings.get_ollama_config()["host"] == settings.ollama_host
+    
+    settings.ensure_directories()
+    assert settings.data_dir.is_dir()
+
+
+def test_default_settings(default_settings):
+    """测试配置默认值（fixture通过model_construct构造，不经过校验）"""
+    assert default_settings.vector_dim == 1024
+    assert default_settings.batch_size == 100
+    assert default_settings.max_workers == 4
+    assert default_settings.ollama_host == "http://localhost:11434"
+    assert default_settings.get_index_type() == "FLAT"
+
+
+def test_settings_overrides():
+    """测试显式传入的配置项（经过校验，显式值优先于环境变量）"""
+    from perspective_kb.config import Settings
+    
+    custom = Settings.model_validate({"vector_dim": 512, "batch_size": 50})
+    assert custom.vector_dim == 512
+    assert custom.batch_size == 50
+
+
+def test_create_settings():
+    """测试配置工厂只校验覆盖项且不修改全局配置"""
+    from pydantic import ValidationError
+    from perspective_kb.config import settings, create_settings
+    
+    original = settings.batch_size
+    custom = create_settings(debug=True, batch_size=str(original + 1))
+    assert custom.debug is True
+    assert custom.batch_size == original + 1
+    assert settings.batch_size == original
+    # 可变字段不与全局配置共享
+    custom.supported_embedding_models.append("custom-model")
+    assert "custom-model" not in settings.supported_embedding_models
+    with pytest.raises(ValidationError):
+        create_settings(batch_size=0)
+
+
+@pytest.mark.parametrize("env_name, env_value, field, expected", [
+    ("PKB_VECTOR_DIM", "512", "vector_dim", 512),
+    ("PKB_BATCH_SIZE", "50", "batch_size", 50),
+    ("PKB_USE_FLAT_INDEX", "false", "use_flat_index", False),
+    ("PKB_INDEX_TYPE", "IVF_SQ8", "index_type", "IVF_SQ8"),
+])
+def test_settings_from_env(monkeypatch, env_name, env_value, field, expected):
+    """测试从环境变量解析配置"""
+    from perspective_kb.config import Settings
+    
+    monkeypatch.setenv(env_name, env_value)
+    assert getattr(Settings(), field) == expected
@@ -0,0 +1,416 @@
+"""
+数据处理模块测试
+"""
+import asyncio
+import copy
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+_KNOWLEDGE_ITEM = {
+    "aspect": "价格",
+    "insight": "价格偏高",
+    "examples": ["太贵了", ""],
+    "keywords": ["贵", "价格"],
+}
+
+
+@pytest.mark.parametrize("method, args, expected", [
+    ("clean_text", ("  价格  太贵了  ",), "价格 太贵了"),
+    ("clean_text", ("a\t\nb",), "a b"),
+    ("clean_text", ("",), ""),
+    ("clean_many", (["  价格  太贵了!!  ", "@@", "", "a\t\nb.."],), ["价格 太贵了!", "", "", "a b."]),
+    ("clean_many", (["太贵\U0001F6FF了", " 好 "],), ["太贵\U0001F6FF了", "好"]),
+    ("build_knowledge_text", (_KNOWLEDGE_ITEM,), "维度：价格 | 观点：价格偏高 | 例子：太贵了 | 关键词：贵 价格"),
+    ("build_knowledge_text", ({},), "未知内容"),
+    ("build_feedback_text", ("太贵了",), "用户反馈：太贵了"),
+    ("build_feedback_text", ("太贵了", "价格高"), "摘要：价格高 | 原文：太贵了"),
+    ("build_feedback_text", ("  ",), "空内容"),
+])
+def test_text_building(helper, method, args, expected):
+    """测试文本清理和知识/反馈文本构建"""
+    assert getattr(helper, method)(*args) == expected
+
+
+async def _scan_json_files(*directories: Path) -> list:
+    """在线程中并发列出各目录下的JSON文件，目录不存在时返回None"""
+    async def scan(directory: Path):
+        if not directory.exists():
+            return None
+        return await asyncio.to_thread(lambda: list(directory.glob("*.json")))
+    
+    return await asyncio.gather(*(scan(directory) for directory in directories))
+
+
+def test_data_structure():
+    """测试数据目录（两个目录同时扫描，目录不存在时跳过）"""
+    from perspective_kb.config import settings
+    
+    directories = (settings.canonical_perspectives_dir, settings.user_feedbacks_dir)
+    results = asyncio.run(_scan_json_files(*directories))
+    
+    if all(files is None for files in results):
+        pytest.skip("知识库和反馈目录都不存在")
+    for files in results:
+        assert files is None or all(path.suffix == ".json" for path in files)
+
+
+class _CappedEmbedClient:
+    """
+    只接受不超过limit条文本的假Ollama客户端，记录每次请求的文本数和当时的批大小
+    
+    前failures次请求抛出error（默认为503），之后正常返回。
+    """
+    
+    def __init__(self, owner, limit: int = 8, failures: int = 0, error: Exception = None):
+        self.owner = owner
+        self.limit = limit
+        self.failures = failures
+        self.error = error
+        self.calls = []
+        self.batch_sizes = []
+        self.texts = []
+    
+    def embed(self, model, input):
+        import ollama
+        
+        texts = [input] if isinstance(input, str) else list(input)
+        self.calls.append(len(texts))
+        self.batch_sizes.append(self.owner.batch_size)
+        self.texts.extend(texts)
+        if len(texts) > self.limit:
+            raise ollama.ResponseError("batch too large", 500)
+        if self.failures > 0:
+            self.failures -= 1
+            raise self.error or ollama.ResponseError("server busy", 503)
+        return {"embeddings": [[float(len(text)), 1.0] for text in texts]}
+
+
+@pytest.fixture
+def embed_helper(helper):
+    """可修改状态的DataHelper副本，统计从零开始"""
+    embed_helper = copy.copy(helper)
+    embed_helper.stats = dict.fromkeys(helper.stats, 0)
+    embed_helper._successes_at_size = 0
+    return embed_helper
+
+
+def test_embed_batch_size_settles(embed_helper):
+    """测试服务端只接受8条时，批大小收敛到8附近而不是一路减半到1"""
+    client = _CappedEmbedClient(embed_helper, limit=8)
+    embed_helper.ollama_client = client
+    embed_helper.batch_size = 50
+    
+    embeddings = embed_helper.embed_batch([f"文本{i}" for i in range(400)], show_progress=False)
+    
+    assert all(embedding is not None for embedding in embeddings)
+    assert client.calls[:3] == [50, 25, 12]
+    assert min(client.batch_sizes[3:]) >= 4
+    assert 4 <= embed_helper.batch_size <= 16
+
+
+def test_embed_floor_retry(embed_helper, monkeypatch):
+    """测试最小批次失败时退避重试，而不是直接放弃"""
+    from perspective_kb import data_helper
+    
+    sleeps = []
+    monkeypatch.setattr(data_helper.time, "sleep", sleeps.append)
+    client = _CappedEmbedClient(embed_helper, failures=2)
+    embed_helper.ollama_client = client
+    
+    embeddings = embed_helper._embed_chunk(["文本"])
+    
+    assert embeddings[0] is not None
+    assert client.calls == [1, 1, 1]
+    assert sleeps == [data_helper._FLOOR_RETRY_BACKOFF, data_helper._FLOOR_RETRY_BACKOFF * 2]
+    
+    client.failures = data_helper._FLOOR_RETRY_COUNT
+    assert embed_helper._embed_chunk(["文本"]) == [None]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """临时目录中的SQLite嵌入缓存"""
+    from perspective_kb.data_helper import SQLiteEmbeddingCache
+    
+    cache = SQLiteEmbeddingCache(tmp_path / "embeddings.sqlite3")
+    yield cache
+    cache.close()
+
+
+def test_cache_round_trip(cache):
+    """测试写入的向量在重新打开缓存后原样读出"""
+    from perspective_kb.data_helper import SQLiteEmbeddingCache
+    
+    key = SQLiteEmbeddingCache.make_key("bge-m3", "太贵了")
+    vector = np.array([0.5, -1.25, 3.0], dtype=np.float32)
+    cache.put_many([(key, vector)])
+    cache.close()
+    
+    reopened = SQLiteEmbeddingCache(cache.path)
+    try:
+        assert len(reopened) == 1
+        np.testing.assert_array_equal(reopened.get(key), vector)
+        assert reopened.get(SQLiteEmbeddingCache.make_key("bge-m3", "很便宜")) is None
+    finally:
+        reopened.close()
+
+
+def test_cache_keyed_by_model(cache):
+    """测试缓存键包含模型名，换模型后同一文本不命中"""
+    from perspective_kb.data_helper import SQLiteEmbeddingCache
+    
+    cache.put_many([(SQLiteEmbeddingCache.make_key("bge-m3", "太贵了"), np.ones(3, dtype=np.float32))])
+    
+    assert SQLiteEmbeddingCache.make_key("bge-m3", "太贵了") != SQLiteEmbeddingCache.make_key("qwen2.5", "太贵了")
+    assert cache.get(SQLiteEmbeddingCache.make_key("qwen2.5", "太贵了")) is None
+
+
+def test_legacy_cache_name():
+    """测试旧名称EmbeddingCache仍可导入旧版数据类，并给出弃用警告"""
+    import hashlib
+    from perspective_kb import data_helper
+    
+    with pytest.warns(DeprecationWarning, match="SQLiteEmbeddingCache"):
+        from perspective_kb.data_helper import EmbeddingCache
+    
+    entry = EmbeddingCache.from_text("太贵了", [0.5, 1.0], "bge-m3")
+    assert entry.text_hash == hashlib.md5("太贵了".encode("utf-8")).hexdigest()
+    assert (entry.embedding, entry.model) == ([0.5, 1.0], "bge-m3")
+    assert "EmbeddingCache" not in data_helper.__all__
+    with pytest.raises(AttributeError):
+        data_helper.NoSuchName
+
+
+def test_cache_get_many_chunks(cache):
+    """测试超过单条语句参数上限的批量查询分段执行，结果完整"""
+    from perspective_kb.data_helper import SQLiteEmbeddingCache
+    
+    count = SQLiteEmbeddingCache._QUERY_CHUNK_SIZE * 2 + 7
+    keys = [SQLiteEmbeddingCache.make_key("bge-m3", f"文本{i}") for i in range(count)]
+    cache.put_many([(key, np.full(2, i, dtype=np.float32)) for i, key in enumerate(keys)])
+    missing = [SQLiteEmbeddingCache.make_key("bge-m3", f"未写入{i}") for i in range(3)]
+    
+    found = cache.get_many(keys + missing)
+    
+    assert len(found) == count
+    assert all(found[key][0] == i for i, key in enumerate(keys))
+
+
+def test_cache_threads(cache):
+    """测试多个线程共用同一连接并发读写"""
+    from concurrent.futures import ThreadPoolExecutor
+    from perspective_kb.data_helper import SQLiteEmbeddingCache
+    
+    def work(worker: int) -> int:
+        keys = [SQLiteEmbeddingCache.make_key("bge-m3", f"{worker}-{i}") for i in range(50)]
+        for key in keys:
+            cache.put_many([(key, np.full(2, worker, dtype=np.float32))])
+            assert cache.get(key) is not None
+        return len(cache.get_many(keys))
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(work, range(8))) == [50] * 8
+    assert len(cache) == 400
+
+
+def test_embed_batch_cache(embed_helper, cache):
+    """测试重复文本只请求一次，第二次全部命中缓存，并统计命中与未命中"""
+    client = _CappedEmbedClient(embed_helper, limit=100)
+    embed_helper.ollama_client = client
+    embed_helper._cache = cache
+    texts = ["太贵了", "很好用", "太贵了", "  ", "很好用", "太贵了"]
+    
+    first = embed_helper.embed_batch(texts, show_progress=False)
+    
+    assert sorted(client.texts) == ["太贵了", "很好用"]
+    assert first[3] is None
+    np.testing.assert_array_equal(first[0], first[5])
+    assert (embed_helper.stats["cache_hits"], embed_helper.stats["cache_misses"]) == (0, 5)
+    
+    second = embed_helper.embed_batch(texts, show_progress=False)
+    
+    assert len(client.texts) == 2
+    assert (embed_helper.stats["cache_hits"], embed_helper.stats["cache_misses"]) == (5, 5)
+    for before, after in zip(first, second):
+        assert (before is None and after is None) or np.array_equal(before, after)
+
+
+@pytest.mark.parametrize("status_code", [400, 401, 404])
+def test_embed_permanent_error(embed_helper, monkeypatch, status_code):
+    """测试不可重试的4xx错误立即失败：不拆分、不退避"""
+    import ollama
+    from perspective_kb import data_helper
+    from perspective_kb.data_helper import EmbeddingError
+    
+    sleeps = []
+    monkeypatch.setattr(data_helper.time, "sleep", sleeps.append)
+    client = _CappedEmbedClient(embed_helper, limit=100, failures=1000,
+                                error=ollama.ResponseError("model not found", status_code))
+    embed_helper.ollama_client = client
+    embed_helper.batch_size = 50
+    
+    with pytest.raises(EmbeddingError, match="model not found"):
+        embed_helper.embed_batch([f"文本{i}" for i in range(400)], show_progress=False)
+    
+    assert client.calls == [50]
+    assert sleeps == []
+    assert embed_helper.batch_size == 50
+
+
+@pytest.fixture(params=["connection", "connect_error", "rate_limit"])
+def unsized_error(request):
+    """与批大小无关的可重试错误：连接失败和限流"""
+    import httpx
+    import ollama
+    
+    return {
+        "connection": ConnectionError("Failed to connect to Ollama"),
+        "connect_error": httpx.ConnectError("connection refused"),
+        "rate_limit": ollama.ResponseError("too many requests", 429),
+    }[request.param]
+
+
+def test_embed_unsized_error_retry(embed_helper, monkeypatch, unsized_error):
+    """测试连接失败和限流时原批次退避重试，不拆分批次"""
+    from perspective_kb import data_helper
+    
+    sleeps = []
+    monkeypatch.setattr(data_helper.time, "sleep", sleeps.append)
+    client = _CappedEmbedClient(embed_helper, limit=100, failures=2, error=unsized_error)
+    embed_helper.ollama_client = client
+    embed_helper.batch_size = 20
+    
+    embeddings = embed_helper.embed_batch([f"文本{i}" for i in range(20)], show_progress=False)
+    
+    assert all(embedding is not None for embedding in embeddings)
+    assert client.calls == [20, 20, 20]
+    assert sleeps == [data_helper._FLOOR_RETRY_BACKOFF, data_helper._FLOOR_RETRY_BACKOFF * 2]
+    assert embed_helper.batch_size == 20
+
+
+def test_embed_unsized_error_degrades(embed_helper, monkeypatch, unsized_error):
+    """测试重试仍失败时只有该批次为None，后续批次照常处理"""
+    from perspective_kb import data_helper
+    
+    monkeypatch.setattr(data_helper.time, "sleep", lambda seconds: None)
+    client = _CappedEmbedClient(embed_helper, limit=100, failures=data_helper._FLOOR_RETRY_COUNT,
+                                error=unsized_error)
+    embed_helper.ollama_client = client
+    embed_helper.batch_size = 10
+    
+    embeddings = embed_helper.embed_batch([f"文本{i}" for i in range(20)], show_progress=False)
+    
+    assert embeddings[:10] == [None] * 10
+    assert all(embedding is not None for embedding in embeddings[10:])
+    assert client.calls == [10] * (data_helper._FLOOR_RETRY_COUNT + 1)
+
+
+class _FakeKnowledgeDB:
+    """假向量库：每个查询向量返回一条固定的观点"""
+    
+    def __init__(self, error: Exception = None):
+        self.error = error
+    
+    def search(self, collection_name, vectors, top_k=5, **kwargs):
+        from perspective_kb.vector_db import SearchResult
+        
+        if self.error is not None:
+            raise self.error
+        return [[SearchResult(id="k1", score=0.9, metadata={"insight": "价格偏高", "aspect": "价格"}, distance=0.8)]
+                for _ in vectors]
+
+
+_FEEDBACKS = [{"fb_id": f"fb{i}", "raw_text": f"反馈{i}太贵了"} for i in range(7)]
+
+
+def _pipeline_threads():
+    import threading
+    return [thread for thread in threading.enumerate() if thread.name.startswith("feedback-")]
+
+
+@pytest.fixture
+def feedback_helper(embed_helper, monkeypatch):
+    """小批次运行反馈流水线，使队列在消费端出错时处于已满状态"""
+    from perspective_kb.config import settings
+    
+    monkeypatch.setattr(settings, "batch_size", 1)
+    embed_helper.ollama_client = _CappedEmbedClient(embed_helper)
+    return embed_helper
+
+
+def test_feedback_pipeline(feedback_helper):
+    """测试反馈流水线按输入顺序产出带匹配观点的记录"""
+    corpus = feedback_helper.build_dictionary("feedback", _FEEDBACKS, _FakeKnowledgeDB())
+    
+    assert [entry["id"] for entry in corpus] == [item["fb_id"] for item in _FEEDBACKS]
+    assert all(entry["metadata"]["match_count"] == 1 for entry in corpus)
+    assert corpus[0]["metadata"]["mapped_perspectives"][0]["insight"] == "价格偏高"
+    assert not _pipeline_threads()
+
+
+def test_feedback_pipeline_search_failure(feedback_helper):
+    """测试观点检索失败时仍产出记录，只是没有匹配结果"""
+    corpus = feedback_helper.build_dictionary("feedback", _FEEDBACKS, _FakeKnowledgeDB(RuntimeError("down")))
+    
+    assert len(corpus) == len(_FEEDBACKS)
+    assert all(entry["metadata"]["match_count"] == 0 for entry in corpus)
+
+
+def test_feedback_pipeline_embed_error(feedback_helper):
+    """测试向量化线程异常时抛出错误，而不是静默返回0条记录"""
+    from perspective_kb.data_helper import DataProcessingError
+    
+    class BrokenClient:
+        def embed(self, model, input):
+            raise KeyError("embeddings")
+    
+    feedback_helper.ollama_client = BrokenClient()
+    with pytest.raises(DataProcessingError):
+        feedback_helper.build_dictionary("feedback", _FEEDBACKS, _FakeKnowledgeDB())
+    assert not _pipeline_threads()
+
+
+class _StageAbort(BaseException):
+    """不继承Exception的异常，模拟工作线程中的KeyboardInterrupt/SystemExit"""
+
+
+@pytest.mark.parametrize("stage", ["embed", "search"])
+def test_feedback_pipeline_base_exception(feedback_helper, stage):
+    """测试工作线程因非Exception异常退出时消费端抛出该异常，而不是一直阻塞"""
+    import threading
+    
+    def abort(*args, **kwargs):
+        raise _StageAbort(stage)
+    
+    if stage == "embed":
+        feedback_helper.embed_batch = abort
+    else:
+        feedback_helper._search_perspectives = abort
+    outcome = []
+    
+    def run():
+        try:
+            feedback_helper.build_dictionary("feedback", _FEEDBACKS, _FakeKnowledgeDB())
+        except BaseException as e:
+            outcome.append(e)
+    
+    caller = threading.Thread(target=run, daemon=True)
+    caller.start()
+    caller.join(timeout=10)
+    
+    assert not caller.is_alive(), "反馈流水线阻塞"
+    assert isinstance(outcome[0], _StageAbort)
+    assert not _pipeline_threads()
+
+
+def test_feedback_pipeline_consumer_error(feedback_helper, monkeypatch):
+    """测试消费端出错时上游线程随之退出，不会阻塞在已满的队列上"""
+    from perspective_kb.data_helper import DataProcessingError
+    
+    # 检索结果比向量少一条，构建记录时取不到对应的匹配结果
+    monkeypatch.setattr(feedback_helper, "_search_perspectives", lambda db, vectors: [])
+    with pytest.raises(DataProcessingError):
+        feedback_helper.build_dictionary("feedback", _FEEDBACKS, _FakeKnowledgeDB())
+    assert not _pipeline_threads()
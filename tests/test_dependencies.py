@@ -0,0 +1,66 @@
+"""
+依赖项检查
+
+默认只用 find_spec 查找模块，不执行导入；``pytest --deep-check`` 时在子进程中
+实际导入各依赖项并检查版本号。缺失时安装：``pixi install``。
+"""
+import importlib.util
+import json
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+_DEPENDENCIES = [
+    ("pydantic", "配置管理"),
+    ("typer", "CLI界面"),
+    ("rich", "终端输出"),
+    ("structlog", "日志系统"),
+    ("pymilvus", "向量数据库"),
+    ("ollama", "嵌入模型"),
+    ("tqdm", "进度条"),
+    ("numpy", "数值计算"),
+    ("pandas", "数据处理"),
+]
+
+_PROBE_SCRIPT = """
+import importlib, json, sys
+versions = {}
+for name in sys.argv[1:]:
+    try:
+        versions[name] = getattr(importlib.import_module(name), "__version__", "未知版本")
+    except Exception:
+        versions[name] = None
+print(json.dumps(versions))
+"""
+
+
+def _probe_versions(packages):
+    """在独立的子进程中导入依赖包，返回 {包名: 版本号或None}"""
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE_SCRIPT, *packages],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        return {}
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_dependencies():
+    """测试所有依赖项都已安装"""
+    # find_spec的耗时主要在逐个路径stat，各包并发查找
+    with ThreadPoolExecutor(max_workers=len(_DEPENDENCIES)) as pool:
+        found = list(pool.map(lambda dep: importlib.util.find_spec(dep[0]) is not None, _DEPENDENCIES))
+    missing = [f"{pkg} ({desc})" for (pkg, desc), ok in zip(_DEPENDENCIES, found) if not ok]
+    assert not missing, f"缺失依赖项: {', '.join(missing)}"
+
+
+def test_dependencies_importable(request):
+    """测试所有依赖项都可以实际导入（深度检查在子进程中导入，测试进程本身不加载这些包）"""
+    if not request.config.getoption("--deep-check"):
+        pytest.skip("需要 --deep-check")
+    
+    versions = _probe_versions([pkg for pkg, _ in _DEPENDENCIES])
+    failed = [f"{pkg} ({desc})" for pkg, desc in _DEPENDENCIES if versions.get(pkg) is None]
+    assert not failed, f"导入失败: {', '.join(failed)}"
@@ -0,0 +1,33 @@
+"""
+模块导入测试
+"""
+import importlib
+import importlib.util
+
+import pytest
+
+# (模块, 检查的属性, 是否必需)；vector_db 和 data_helper 可能因为缺少依赖而失败
+_MODULES = [
+    ("perspective_kb.config", ("settings", "LogLevel", "VectorDBType"), True),
+    ("perspective_kb.utils", ("get_logger", "console"), True),
+    ("perspective_kb.vector_db", ("BaseVectorDB", "LocalVectorDB"), False),
+    ("perspective_kb.data_helper", ("DataHelper",), False),
+    ("perspective_kb.cli", ("app",), True),
+]
+
+
+@pytest.mark.parametrize("module_name, attrs, required", _MODULES)
+def test_imports(module_name, attrs, required):
+    """测试模块是否可以正常导入并提供预期的属性"""
+    try:
+        # find_spec先判断模块是否存在，缺失时不必付出导入开销
+        if importlib.util.find_spec(module_name) is None:
+            raise ImportError(f"找不到模块 {module_name}")
+        module = importlib.import_module(module_name)
+    except ImportError as e:
+        if required:
+            raise
+        pytest.skip(f"{module_name} 导入失败（缺少可选依赖）: {e}")
+    
+    for attr in attrs:
+        assert hasattr(module, attr), f"{module_name} 缺少 {attr}"
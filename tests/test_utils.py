@@ -0,0 +1,38 @@
+"""
+工具模块测试
+"""
+import json
+import logging
+
+
+def test_logger(caplog):
+    """测试结构化日志以JSON输出到标准库logging"""
+    from perspective_kb.utils import get_logger
+    
+    caplog.set_level(logging.INFO, logger="test")
+    get_logger("test").info("测试日志消息")
+    assert json.loads(caplog.records[-1].getMessage())["event"] == "测试日志消息"
+
+
+def test_console(capsys):
+    """测试控制台输出"""
+    from perspective_kb.utils import console
+    
+    console.print("[green]测试控制台输出[/green]")
+    assert "测试控制台输出" in capsys.readouterr().out
+
+
+def test_get_logger_cached():
+    """测试相同参数的get_logger调用返回同一个缓存的记录器"""
+    from perspective_kb.utils import get_logger
+    
+    assert get_logger("test") is get_logger("test")
+    assert get_logger("test") is not get_logger("test", level="DEBUG")
+
+
+def test_ensure_directory(tmp_path):
+    """测试目录创建（tmp_path由pytest按worker分配并统一清理）"""
+    from perspective_kb.utils import ensure_directory
+    
+    ensure_directory(tmp_path / "sub" / "nested")
+    assert (tmp_path / "sub" / "nested").is_dir()
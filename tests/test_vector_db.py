@@ -0,0 +1,553 @@
+"""
+向量数据库测试
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+
+def test_vector_db_lifecycle(milvus_client, tmp_path):
+    """测试向量数据库的连接、连接失败和上下文管理器（MilvusClient由fixture替换为mock）"""
+    from perspective_kb.vector_db import LocalVectorDB, ConnectionError
+    
+    # 连接成功：客户端取自mock，关闭后归还连接池
+    db = LocalVectorDB(str(tmp_path / "ok.db"))
+    assert db.connect()
+    assert db.client is milvus_client.return_value
+    db.close()
+    assert db.client is None
+    
+    # 连接失败：包装为ConnectionError
+    milvus_client.side_effect = RuntimeError("connection refused")
+    with pytest.raises(ConnectionError):
+        LocalVectorDB(str(tmp_path / "fail.db")).connect()
+    milvus_client.side_effect = None
+    
+    # 上下文管理器：退出时关闭连接
+    with LocalVectorDB(str(tmp_path / "ctx.db")) as db:
+        db.connect()
+        assert db.client is not None
+    assert db.client is None
+
+
+@pytest.mark.parametrize("with_ml_dtypes", [True, False])
+def test_bfloat16_query_encoding(local_db, monkeypatch, with_ml_dtypes):
+    """测试bfloat16集合的查询向量以ndarray发送，不会被pymilvus当作BINARY_VECTOR"""
+    from pymilvus.client.prepare import Prepare
+    from pymilvus.grpc_gen import common_pb2
+    from perspective_kb import vector_db
+    from perspective_kb.config import settings, VectorDType
+    
+    if with_ml_dtypes and vector_db._NP_BFLOAT16 is None:
+        pytest.skip("未安装ml_dtypes")
+    if not with_ml_dtypes:
+        monkeypatch.setattr(vector_db, "_NP_BFLOAT16", None)
+    monkeypatch.setattr(settings, "vector_dtype", VectorDType.BFLOAT16)
+    query = np.linspace(-1.0, 1.0, 8, dtype=np.float32)
+    
+    request, *_ = local_db._search_request("knowledge", [query], 3, None, None, None, None)
+    
+    assert all(isinstance(vector, np.ndarray) for vector in request["data"])
+    # 不传schema，与pymilvus 2.6及3.x未带schema的调用一致
+    group = common_pb2.PlaceholderGroup.FromString(Prepare._prepare_placeholder_str(request["data"]))
+    placeholder = group.placeholders[0]
+    if with_ml_dtypes:
+        assert placeholder.type == common_pb2.PlaceholderType.BFloat16Vector
+        assert placeholder.values[0] == vector_db._to_bfloat16_bytes(query)
+    else:
+        assert placeholder.type == common_pb2.PlaceholderType.FloatVector
+
+
+@pytest.mark.parametrize("metric, distance, expected", [
+    ("COSINE", 0.5, 0.75),
+    ("COSINE", -1.0, 0.0),
+    ("L2", 0.0, 1.0),
+    ("L2", 1.0, 0.5),
+    ("UNIT_L2", 0.0, 1.0),
+    ("UNIT_L2", 2.0, 0.5),
+    ("IP", 0.4, 0.4),
+    ("IP", 1.7, 1.0),
+    ("IP", -0.3, 0.0),
+])
+def test_score_mapping(metric, distance, expected):
+    """测试各度量方式下距离到0-1分数的换算，原始距离保持不变"""
+    from perspective_kb.vector_db import LocalVectorDB
+    
+    hits = [[{"id": "a", "distance": distance, "entity": {"metadata": {"aspect": "价格"}}}]]
+    [[result]] = LocalVectorDB._to_search_results(hits, metric)
+    assert result.score == pytest.approx(expected)
+    assert result.distance == pytest.approx(distance)
+    assert result.metadata == {"aspect": "价格"}
+
+
+@pytest.fixture
+def unit_l2_settings(monkeypatch):
+    """按当前配置新建的索引会是单位L2模式（IVF + COSINE + ivf_use_l2）"""
+    from perspective_kb.config import settings
+    
+    monkeypatch.setattr(settings, "ivf_use_l2", True)
+    monkeypatch.setattr(settings, "similarity_metric", "COSINE")
+    monkeypatch.setattr(settings, "index_type", None)
+    monkeypatch.setattr(settings, "use_flat_index", False)
+    return settings
+
+
+@pytest.mark.parametrize("metric_type, unit_l2, expected", [
+    ("COSINE", False, "COSINE"),
+    ("IP", False, "IP"),
+    ("L2", False, "L2"),
+    ("L2", True, "UNIT_L2"),
+])
+def test_metric_from_collection_index(local_db, unit_l2_settings, metric_type, unit_l2, expected):
+    """测试度量方式取自集合的索引和属性，而不是当前配置"""
+    client = local_db.client
+    client.list_indexes.return_value = ["vector"]
+    client.describe_index.return_value = {"index_type": "FLAT", "metric_type": metric_type, "index_name": "vector"}
+    client.describe_collection.return_value = {"properties": {"perspective_kb.unit_l2": "true"} if unit_l2 else {}}
+    query = np.array([3.0, 4.0], dtype=np.float32)
+    
+    index = local_db._vector_index("knowledge")
+    request, _, metric, _ = local_db._search_request("knowledge", [query], 2, None, None, None, index)
+    
+    assert metric == expected
+    # FLAT索引不带nprobe等搜索参数
+    assert request["search_params"] == {"params": {}}
+    # 只有单位L2模式才归一化查询向量
+    assert np.allclose(request["data"][0], query / 5.0 if expected == "UNIT_L2" else query)
+
+
+@pytest.mark.parametrize("index_type, expected", [
+    ("FLAT", {}),
+    ("IVF_FLAT", {"nprobe": 16}),
+    ("IVF_SQ8", {"nprobe": 16}),
+    ("IVF_PQ", {"nprobe": 16}),
+    ("HNSW", {"ef": 64}),
+])
+def test_index_search_params(monkeypatch, index_type, expected):
+    """测试各索引类型的默认搜索参数：nprobe只发给IVF系列，ef不小于返回条数"""
+    from perspective_kb.config import settings
+    from perspective_kb.vector_db import _index_search_params
+    
+    monkeypatch.setattr(settings, "ivf_nprobe", 16)
+    monkeypatch.setattr(settings, "hnsw_ef", 64)
+    
+    assert _index_search_params(index_type, 10) == {"params": expected}
+    if index_type == "HNSW":
+        assert _index_search_params(index_type, 100) == {"params": {"ef": 100}}
+
+
+def test_unit_l2_collection_marked(local_db, unit_l2_settings):
+    """测试单位L2模式建索引时以L2度量并在集合属性上标记"""
+    local_db.create_collection("knowledge", vector_dim=128)
+    
+    client = local_db.client
+    index_params = client.create_index.call_args.kwargs["index_params"]
+    assert index_params.add_index.call_args.kwargs["metric_type"] == "L2"
+    client.alter_collection_properties.assert_called_once_with("knowledge", {"perspective_kb.unit_l2": "true"})
+    assert local_db._metric_of("knowledge") == "UNIT_L2"
+
+
+def _entities(count: int, dim: int = 4):
+    return [
+        {"id": str(i), "vector": np.full(dim, i, dtype=np.float32), "text_for_embedding": f"文本{i}", "metadata": {}}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def knowledge_db(local_db):
+    """mock客户端上有一个4维、未建索引的knowledge集合"""
+    client = local_db.client
+    client.describe_collection.return_value = {
+        "fields": [{"name": "id", "params": {}}, {"name": "vector", "params": {"dim": 4}}],
+        "properties": {},
+    }
+    client.list_indexes.return_value = []
+    return local_db
+
+
+@pytest.mark.parametrize("flush", [False, True])
+def test_upsert_flush_opt_in(knowledge_db, flush):
+    """测试upsert默认只写入，flush=True时才刷盘并加载集合"""
+    client = knowledge_db.client
+    client.upsert.return_value = {"upsert_count": 3}
+    
+    assert knowledge_db.upsert(_entities(3), "knowledge", flush=flush) is True
+    
+    client.upsert.assert_called_once()
+    assert client.flush.called is flush
+    assert client.load_collection.called is flush
+
+
+def test_finalize_bulk(knowledge_db):
+    """测试finalize_bulk只做一次刷盘和加载，且先刷盘后加载"""
+    client = knowledge_db.client
+    client.upsert.return_value = {"upsert_count": 3}
+    for _ in range(3):
+        knowledge_db.upsert(_entities(3), "knowledge")
+    client.flush.assert_not_called()
+    
+    knowledge_db.finalize_bulk("knowledge")
+    
+    calls = [name for name, _, _ in client.mock_calls if name in ("flush", "load_collection")]
+    assert calls == ["flush", "load_collection"]
+    client.flush.assert_called_once_with("knowledge")
+    client.load_collection.assert_called_once_with("knowledge")
+    assert "knowledge" in knowledge_db._loaded
+
+
+_IVF_INDEX = {
+    "field_name": "vector", "index_name": "vector", "index_type": "IVF_FLAT", "metric_type": "L2",
+    "nlist": "128", "total_rows": 3, "indexed_rows": 3, "pending_index_rows": 0, "state": "Finished",
+}
+
+
+@pytest.fixture
+def indexed_db(knowledge_db):
+    """knowledge集合上有一个IVF_FLAT向量索引"""
+    client = knowledge_db.client
+    client.list_indexes.return_value = ["vector"]
+    client.describe_index.return_value = dict(_IVF_INDEX)
+    client.upsert.return_value = {"upsert_count": 3}
+    return knowledge_db
+
+
+def test_bulk_load_rebuilds_index(indexed_db):
+    """测试批量导入：释放并删除索引 -> 写入 -> 刷盘 -> 按原参数重建 -> 加载"""
+    client = indexed_db.client
+    
+    with indexed_db.bulk_load("knowledge"):
+        indexed_db.upsert(_entities(3), "knowledge")
+    
+    rpcs = ("release_collection", "drop_index", "upsert", "flush", "create_index", "load_collection")
+    assert [name for name, _, _ in client.mock_calls if name in rpcs] == list(rpcs)
+    client.drop_index.assert_called_once_with("knowledge", "vector")
+    index_params = client.create_index.call_args.kwargs["index_params"]
+    index_params.add_index.assert_called_with(
+        field_name="vector", index_type="IVF_FLAT", index_name="vector", metric_type="L2",
+        params={"nlist": "128"}
+    )
+    assert "knowledge" in indexed_db._loaded
+
+
+@pytest.mark.parametrize("rebuild_fails", [False, True])
+def test_bulk_load_keeps_ingest_error(indexed_db, rebuild_fails):
+    """测试导入出错时仍重建索引，抛出的仍是导入的异常"""
+    client = indexed_db.client
+    if rebuild_fails:
+        client.create_index.side_effect = RuntimeError("索引服务不可用")
+    
+    with pytest.raises(ValueError, match="导入失败") as info:
+        with indexed_db.bulk_load("knowledge"):
+            raise ValueError("导入失败")
+    
+    client.flush.assert_called_once_with("knowledge")
+    client.create_index.assert_called_once()
+    notes = getattr(info.value, "__notes__", [])
+    assert any("索引服务不可用" in note for note in notes) is rebuild_fails
+    assert client.load_collection.called is not rebuild_fails
+
+
+class _ClientFactory:
+    """记录新建次数的客户端工厂"""
+    
+    def __init__(self):
+        self.clients = []
+    
+    def __call__(self):
+        from unittest.mock import Mock
+        
+        client = Mock(name=f"client{len(self.clients)}")
+        self.clients.append(client)
+        return client
+
+
+def test_pool_blocks_at_max_total():
+    """测试连接数达到上限时等待归还，等不到则超时报错"""
+    import threading
+    from perspective_kb.vector_db import ConnectionError, _ClientPool
+    
+    factory = _ClientFactory()
+    pool = _ClientPool(max_total=1, max_idle=1, max_block_wait=0.05)
+    client = pool.get_client(("uri",), factory)
+    with pytest.raises(ConnectionError):
+        pool.get_client(("uri",), factory)
+    
+    # 另一个线程稍后归还，等待中的借出拿到同一个客户端
+    pool.max_block_wait = 5.0
+    timer = threading.Timer(0.05, pool.return_client, (("uri",), client))
+    timer.start()
+    try:
+        assert pool.get_client(("uri",), factory) is client
+    finally:
+        timer.join()
+    assert len(factory.clients) == 1
+    # 上限按连接参数分组计算
+    assert pool.get_client(("other",), factory) is factory.clients[1]
+
+
+def test_pool_closes_over_max_idle():
+    """测试归还时空闲连接已满则关闭客户端并释放名额"""
+    from perspective_kb.vector_db import _ClientPool
+    
+    factory = _ClientFactory()
+    pool = _ClientPool(max_total=3, max_idle=1, max_block_wait=0.05)
+    first, second = pool.get_client(("uri",), factory), pool.get_client(("uri",), factory)
+    
+    pool.return_client(("uri",), first)
+    pool.return_client(("uri",), second)
+    
+    first.close.assert_not_called()
+    second.close.assert_called_once()
+    assert pool._total[("uri",)] == 1
+    assert pool.get_client(("uri",), factory) is first
+
+
+def test_pool_discards_failed_connection(milvus_client):
+    """测试健康检查失败时丢弃并关闭客户端，不放回连接池"""
+    from unittest.mock import Mock
+    from pymilvus import MilvusClient
+    from perspective_kb import vector_db
+    from perspective_kb.vector_db import ConnectionError, ServerVectorDB
+    
+    client = Mock(spec_set=MilvusClient)
+    client.list_collections.side_effect = RuntimeError("服务不可用")
+    milvus_client.return_value = client
+    db = ServerVectorDB(host="localhost", port=19530)
+    
+    with pytest.raises(ConnectionError):
+        db.connect()
+    
+    client.close.assert_called_once()
+    assert db.client is None
+    pool = vector_db._get_client_pool()
+    assert set(pool._total.values()) == {0}
+    assert all(idle.empty() for idle in pool._idle.values())
+
+
+def _brute_force(metric: str, query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """按定义逐条计算距离，作为重排结果的对照"""
+    if metric == "L2":
+        return np.array([float(np.sum((c - query) ** 2)) for c in candidates])
+    if metric == "COSINE":
+        return np.array([float(c @ query / (np.linalg.norm(c) * np.linalg.norm(query))) for c in candidates])
+    return np.array([float(c @ query) for c in candidates])
+
+
+@pytest.mark.parametrize("metric", ["L2", "COSINE", "IP"])
+@pytest.mark.parametrize("top_k", [5, 50])
+def test_rerank(metric, top_k):
+    """测试按原始向量重排：顺序与逐条计算一致，只保留前top_k并写回精确距离"""
+    from perspective_kb.vector_db import LocalVectorDB
+    
+    rng = np.random.default_rng(7)
+    candidates = rng.normal(size=(30, 8)).astype(np.float32) * rng.uniform(0.5, 2.0, size=(30, 1)).astype(np.float32)
+    query = rng.normal(size=8).astype(np.float32)
+    # 量化索引返回的近似距离是乱的，重排不应依赖它
+    hits = [{"id": str(i), "distance": -1.0, "entity": {"vector": vector}} for i, vector in enumerate(candidates)]
+    
+    [reranked] = LocalVectorDB._rerank([hits], [query], metric, top_k)
+    
+    exact = _brute_force(metric, query, candidates)
+    order = np.argsort(-exact if metric in ("COSINE", "IP") else exact)[:top_k]
+    assert [hit["id"] for hit in reranked] == [str(i) for i in order]
+    np.testing.assert_allclose([hit["distance"] for hit in reranked], exact[order], rtol=1e-5, atol=1e-5)
+    assert LocalVectorDB._rerank([[]], [query], metric, top_k) == [[]]
+
+
+def _query_hits(request_data, top_k: int = 1):
+    """假搜索结果：每个查询返回一条以查询向量首元素为id的命中"""
+    return [[{"id": str(int(query[0])), "distance": 0.5, "entity": {"metadata": {}}}] for query in request_data]
+
+
+@pytest.fixture
+def search_db(knowledge_db, monkeypatch):
+    """查询向量原样发送（不按单位L2归一化），mock搜索按查询顺序返回结果"""
+    from perspective_kb.config import settings
+    
+    monkeypatch.setattr(settings, "ivf_use_l2", False)
+    knowledge_db.client.search.side_effect = lambda **request: _query_hits(request["data"])
+    return knowledge_db
+
+
+def test_search_many_order(search_db):
+    """测试search_many一次请求全部查询，并按查询顺序产出结果"""
+    vectors = np.arange(7, dtype=np.float32)[:, np.newaxis] * np.ones(4, dtype=np.float32)
+    
+    results = list(search_db.search_many("knowledge", vectors, top_k=1))
+    
+    assert [result[0].id for result in results] == [str(i) for i in range(7)]
+    search_db.client.search.assert_called_once()
+    assert [result[0].id for result in search_db.search_many("knowledge", vectors[3])] == ["3"]
+
+
+def test_search_stream_order(search_db):
+    """测试search_stream分批请求，结果仍按查询顺序产出"""
+    vectors = np.arange(10, dtype=np.float32)[:, np.newaxis] * np.ones(4, dtype=np.float32)
+    
+    async def collect():
+        return [result[0].id async for result in search_db.search_stream("knowledge", vectors, top_k=1, batch_size=3)]
+    
+    assert asyncio.run(collect()) == [str(i) for i in range(10)]
+    assert search_db.client.search.call_count == 4
+
+
+@pytest.mark.parametrize("failing_batches, expected", [((), True), ((2,), True), ((1, 2, 3, 4), False)])
+def test_upsert_async_batches(knowledge_db, failing_batches, expected):
+    """测试线程池并发写入：按batch_size分批、每条只写一次，失败批次只计为0条"""
+    import threading
+    
+    lock = threading.Lock()
+    written = []
+    
+    def upsert(collection_name, rows):
+        batch_num = int(rows[0]["id"]) // 3 + 1
+        if batch_num in failing_batches:
+            raise RuntimeError(f"批次 {batch_num} 写入失败")
+        with lock:
+            written.append([row["id"] for row in rows])
+        return {"upsert_count": len(rows)}
+    
+    knowledge_db.client.upsert.side_effect = upsert
+    
+    assert asyncio.run(knowledge_db.upsert_async(_entities(10), "knowledge", batch_size=3)) is expected
+    
+    assert knowledge_db.client.upsert.call_count == 4
+    expected_batches = [[str(i) for i in range(start, min(start + 3, 10))] for start in range(0, 10, 3)]
+    assert sorted(written) == [batch for num, batch in enumerate(expected_batches, 1) if num not in failing_batches]
+    knowledge_db.client.flush.assert_not_called()
+
+
+@pytest.fixture
+def async_db(milvus_client, monkeypatch, tmp_path):
+    """
+    同步和异步客户端都为mock的AsyncLocalVectorDB，knowledge集合为4维、尚无索引
+    
+    集合元数据只设置在异步客户端上：异步读写不应经过同步客户端。
+    """
+    from unittest.mock import AsyncMock, Mock
+    from pymilvus import AsyncMilvusClient, MilvusClient
+    from perspective_kb import vector_db
+    from perspective_kb.config import settings
+    
+    milvus_client.return_value = Mock(spec_set=MilvusClient)
+    aclient = AsyncMock(spec=AsyncMilvusClient)
+    aclient.describe_collection.return_value = {"fields": [{"name": "vector", "params": {"dim": 4}}], "properties": {}}
+    aclient.list_indexes.return_value = []
+    monkeypatch.setattr(vector_db, "AsyncMilvusClient", Mock(return_value=aclient))
+    monkeypatch.setattr(settings, "ivf_use_l2", False)
+    
+    db = vector_db.AsyncLocalVectorDB(str(tmp_path / "async.db"))
+    asyncio.run(db.connect_async())
+    yield db
+    db.close()
+
+
+@pytest.mark.parametrize("index", [None, {"index_name": "vector", "index_type": "IVF_FLAT", "metric_type": "L2"}])
+def test_async_db_skips_sync_client(async_db, index):
+    """测试异步搜索和写入的元数据查询、补建索引和加载都经异步客户端，不阻塞事件循环"""
+    aclient = async_db.aclient
+    if index is not None:
+        aclient.list_indexes.return_value = ["vector"]
+        aclient.describe_index.return_value = index
+    aclient.search.side_effect = lambda **request: _query_hits(request["data"])
+    aclient.upsert.return_value = {"upsert_count": 3}
+    
+    async def run():
+        results = await async_db.search_async("knowledge", [np.ones(4, dtype=np.float32)], top_k=1)
+        inserted = await async_db.upsert_async(_entities(3), "knowledge")
+        return results, inserted
+    
+    results, inserted = asyncio.run(run())
+    
+    assert results[0][0].id == "1" and inserted is True
+    assert async_db.client.mock_calls == []
+    assert aclient.create_index.await_count == (1 if index is None else 0)
+    aclient.load_collection.assert_awaited_once_with("knowledge")
+    # 元数据查询后已缓存，第二次搜索不再发起
+    aclient.describe_collection.reset_mock()
+    asyncio.run(async_db.search_async("knowledge", [np.ones(4, dtype=np.float32)], top_k=1))
+    aclient.describe_collection.assert_not_awaited()
+
+
+@pytest.mark.parametrize("built", [True, False])
+def test_async_index_wait_failure(async_db, built):
+    """测试异步建索引只是等待构建失败时（Milvus Lite），以list_indexes确认后照常记录"""
+    aclient = async_db.aclient
+    aclient.create_index.side_effect = RuntimeError("Method not implemented!")
+    aclient.list_indexes.side_effect = [[], ["vector"] if built else []]
+    
+    asyncio.run(async_db._ensure_index_exists_async("knowledge"))
+    
+    assert ("knowledge" in async_db._indexed) is built
+    assert ("knowledge" in async_db._index_info) is built
+
+
+def test_async_upsert(async_db):
+    """测试异步客户端并发写入：批次乱序完成时计数正确，失败批次不影响其他批次"""
+    written = []
+    
+    async def upsert(collection_name, rows):
+        batch_num = int(rows[0]["id"]) // 3 + 1
+        # 先发出的批次后完成
+        await asyncio.sleep(0.01 * (5 - batch_num))
+        if batch_num == 2:
+            raise RuntimeError("批次写入失败")
+        written.append(batch_num)
+        return {"upsert_count": len(rows)}
+    
+    async_db.aclient.upsert.side_effect = upsert
+    
+    assert asyncio.run(async_db.upsert_async(_entities(10), "knowledge", batch_size=3, flush=True)) is True
+    
+    assert sorted(written) == [1, 3, 4]
+    async_db.aclient.flush.assert_awaited_once_with("knowledge")
+    async_db.aclient.load_collection.assert_awaited_once_with("knowledge")
+    async_db.client.upsert.assert_not_called()
+
+
+def test_async_search_stream_order(async_db):
+    """测试异步search_stream：前一批较慢时结果仍按查询顺序产出"""
+    async def search(**request):
+        await asyncio.sleep(0.02 if request["data"][0][0] == 0 else 0.0)
+        return _query_hits(request["data"])
+    
+    async_db.aclient.search.side_effect = search
+    vectors = np.arange(8, dtype=np.float32)[:, np.newaxis] * np.ones(4, dtype=np.float32)
+    
+    async def collect():
+        return [result[0].id async for result in async_db.search_stream("knowledge", vectors, top_k=1, batch_size=3)]
+    
+    assert asyncio.run(collect()) == [str(i) for i in range(8)]
+    assert async_db.aclient.search.await_count == 3
+    async_db.client.search.assert_not_called()
+
+
+@pytest.mark.parametrize("method, message", [
+    ("upsert", r"第 2 条为 5 维.*为 4 维（共 2 条不匹配）"),
+    ("upsert_columns", r"第 0 条为 6 维.*为 4 维（共 3 条不匹配）"),
+    ("upsert_async", r"第 2 条为 5 维.*为 4 维（共 2 条不匹配）"),
+    ("async_upsert_async", r"第 2 条为 5 维.*为 4 维（共 2 条不匹配）"),
+])
+def test_upsert_dims_check(knowledge_db, async_db, method, message):
+    """测试维度不符时在发起写入请求前报错，并指出第一条不匹配的位置"""
+    from perspective_kb.vector_db import VectorDBError
+    
+    entities = _entities(5)
+    entities[2]["vector"] = np.ones(5, dtype=np.float32)
+    entities[4]["vector"] = np.ones(3, dtype=np.float32)
+    
+    with pytest.raises(VectorDBError, match=message):
+        if method == "upsert":
+            knowledge_db.upsert(entities, "knowledge")
+        elif method == "upsert_columns":
+            vectors = np.ones((3, 6), dtype=np.float32)
+            knowledge_db.upsert_columns("knowledge", ["a", "b", "c"], vectors, ["t"] * 3, [{}] * 3)
+        elif method == "upsert_async":
+            asyncio.run(knowledge_db.upsert_async(entities, "knowledge"))
+        else:
+            asyncio.run(async_db.upsert_async(entities, "knowledge"))
+    
+    knowledge_db.client.upsert.assert_not_called()
+    async_db.aclient.upsert.assert_not_called()